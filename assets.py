@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Production build with content-hash fingerprinted assets
+
+Copies styles.css and everything under media/ into dist/ under hashed names
+(styles.css -> styles.3f9a1c2b.css), then copies every generated page with
+its references rewritten to the hashed names. Hashed files never change, so
+dist/ can be served with immutable cache headers; only the pages themselves
+need revalidating. dist/asset-manifest.json maps each asset to its hashed
+name.
+
+A page is only re-read and rewritten when its source changed or when an
+asset it references got a new hash.
+
+With --minify, stylesheets and pages are also minified and each page gets
+its critical CSS inlined (see minify.py). Minified pages are keyed by a hash
+of their input, so a page whose source was merely touched is not redone.
+Usage: python3 assets.py [--jobs N] [--minify]    # Build and precompress dist/
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+
+from site_io import write_if_changed
+from compress import compress_tree, is_sibling
+from minify import MINIFY_VERSION, minify_css, minify_html, parse_css, inline_critical_css
+
+DIST_DIR = 'dist'
+ASSET_MANIFEST_NAME = 'asset-manifest.json'
+STATE_PATH = os.path.join('.build', 'dist-state.json')
+STATE_VERSION = 1
+HASH_LENGTH = 8
+
+ASSET_FILES = ['styles.css', 'search.js']
+ASSET_DIRS = ['media']
+PAGE_FILES = ['index.html', 'feed.xml']
+PAGE_DIRS = ['page', 'archive', 'posts']
+# Fetched by name at runtime (search shards), so copied without fingerprinting
+DATA_DIRS = ['search']
+SKIP_NAMES = {'README.md', 'post-template.html', 'index.json'}
+
+_URL_ATTRIBUTE = re.compile(r'\b(src|href|poster)="([^"]+)"')
+_SRCSET_ATTRIBUTE = re.compile(r'\bsrcset="([^"]+)"')
+_EXTERNAL = re.compile(r'^(?:[a-z][a-z0-9+.-]*:|//|#)', re.IGNORECASE)
+
+def _walk_files(directory):
+    """Yield every file below directory"""
+    pending = [directory]
+    while pending:
+        path = pending.pop()
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir():
+                pending.append(entry.path)
+            elif entry.is_file() and entry.name not in SKIP_NAMES:
+                yield entry.path
+
+def list_assets():
+    """Return the source path of every fingerprinted asset"""
+    assets = [path for path in ASSET_FILES if os.path.isfile(path)]
+    for directory in ASSET_DIRS:
+        assets.extend(_walk_files(directory))
+    return sorted(path.replace(os.sep, '/') for path in assets)
+
+def list_pages():
+    """Return the source path of every generated page and data file"""
+    pages = [path for path in PAGE_FILES if os.path.isfile(path)]
+    for directory in PAGE_DIRS:
+        pages.extend(path for path in _walk_files(directory) if path.endswith('.html'))
+    for directory in DATA_DIRS:
+        pages.extend(_walk_files(directory))
+    return sorted(path.replace(os.sep, '/') for path in pages)
+
+def hash_file(filepath):
+    """Return the sha256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def fingerprint_name(path, digest):
+    """styles.css + digest -> styles.<hash>.css"""
+    root, extension = os.path.splitext(path)
+    return f"{root}.{digest[:HASH_LENGTH]}{extension}"
+
+def _stat_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _split_url(url):
+    """Split 'a/b.png?x#y' into ('a/b.png', '?x#y')"""
+    for i, char in enumerate(url):
+        if char in '?#':
+            return url[:i], url[i:]
+    return url, ''
+
+def rewrite_references(html, page_path, asset_map):
+    """Point src/href/poster/srcset URLs at hashed assets
+    
+    Returns the rewritten HTML and the sorted list of assets it references.
+    """
+    page_dir = os.path.dirname(page_path)
+    refs = set()
+    
+    def resolve(url):
+        if _EXTERNAL.match(url):
+            return url
+        path, suffix = _split_url(url)
+        if url.startswith('/'):
+            asset = path.lstrip('/')
+        else:
+            asset = os.path.normpath(os.path.join(page_dir, path)).replace(os.sep, '/')
+        hashed = asset_map.get(asset)
+        if hashed is None:
+            return url
+        refs.add(asset)
+        if url.startswith('/'):
+            return '/' + hashed + suffix
+        return os.path.relpath(hashed, page_dir or '.').replace(os.sep, '/') + suffix
+    
+    def replace_url(match):
+        return f'{match.group(1)}="{resolve(match.group(2))}"'
+    
+    def replace_srcset(match):
+        candidates = []
+        for candidate in match.group(1).split(','):
+            parts = candidate.strip().split(None, 1)
+            if parts:
+                parts[0] = resolve(parts[0])
+            candidates.append(' '.join(parts))
+        return f'srcset="{", ".join(candidates)}"'
+    
+    html = _URL_ATTRIBUTE.sub(replace_url, html)
+    if 'srcset="' in html:
+        html = _SRCSET_ATTRIBUTE.sub(replace_srcset, html)
+    return html, sorted(refs)
+
+def _page_stylesheets(page_path, refs, asset_map, stylesheets, parsed):
+    """Map the href a page uses for each minified stylesheet it references to its parsed rules"""
+    page_dir = os.path.dirname(page_path)
+    sheets = {}
+    for asset in refs:
+        hashed = asset_map[asset]
+        if hashed not in stylesheets:
+            continue
+        if hashed not in parsed:
+            with open(stylesheets[hashed], 'r', encoding='utf-8') as f:
+                parsed[hashed] = parse_css(minify_css(f.read()))
+        sheets[os.path.relpath(hashed, page_dir or '.').replace(os.sep, '/')] = parsed[hashed]
+    return sheets
+
+def _load_state():
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {'version': STATE_VERSION, 'assets': {}, 'pages': {}}
+
+def _minified_digest(digest):
+    """Minified stylesheets get their own hashed name, so toggling --minify never reuses a URL"""
+    return hashlib.sha256(f"{digest}:min{MINIFY_VERSION}".encode('utf-8')).hexdigest()
+
+def build_dist(dist_dir=DIST_DIR, minify=False):
+    """Fingerprint assets and rewrite pages into dist_dir
+    
+    Returns a dict of counts for the build report.
+    """
+    state = _load_state()
+    old_assets = state['assets']
+    # Switching --minify on or off changes every page
+    old_pages = state['pages'] if state.get('minify', False) == minify else {}
+    
+    # Assets: hash (reusing the cached digest when size and mtime match) and copy new hashes
+    assets = {}
+    asset_map = {}
+    changed_assets = set()
+    # Hashed stylesheet -> source, parsed on first use for critical CSS
+    stylesheets = {}
+    parsed = {}
+    copied = 0
+    for path in list_assets():
+        signature = _stat_signature(path)
+        cached = old_assets.get(path)
+        digest = cached[1] if cached and cached[0] == signature else hash_file(path)
+        assets[path] = [signature, digest]
+        minify_asset = minify and path.endswith('.css')
+        hashed = fingerprint_name(path, _minified_digest(digest) if minify_asset else digest)
+        asset_map[path] = hashed
+        if not cached or cached[1] != digest:
+            changed_assets.add(path)
+        target = os.path.join(dist_dir, hashed)
+        if minify_asset:
+            stylesheets[hashed] = path
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            if minify_asset:
+                with open(path, 'r', encoding='utf-8') as f:
+                    write_if_changed(target, minify_css(f.read()))
+            else:
+                shutil.copyfile(path, target + '.tmp')
+                os.replace(target + '.tmp', target)
+            copied += 1
+    # Deleted assets also invalidate the pages that referenced them
+    changed_assets.update(path for path in old_assets if path not in assets)
+    # A new asset may satisfy a reference no page recorded, so recheck them all
+    recheck_all = any(path not in old_assets for path in assets)
+    
+    # Pages: skip any whose source and referenced assets are unchanged
+    pages = {}
+    written = 0
+    skipped = 0
+    for path in list_pages():
+        signature = _stat_signature(path)
+        target = os.path.join(dist_dir, path)
+        previous = old_pages.get(path)
+        if (previous and not recheck_all and previous['stat'] == signature
+                and os.path.exists(target) and not changed_assets.intersection(previous['refs'])):
+            pages[path] = previous
+            skipped += 1
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        refs = []
+        record = {'stat': signature}
+        if path.endswith('.html'):
+            html, refs = rewrite_references(html, path, asset_map)
+            if minify:
+                # The rewritten page names every stylesheet by content hash, so it keys the result
+                record['input'] = hashlib.sha256(f"{MINIFY_VERSION}:{html}".encode('utf-8')).hexdigest()
+                if previous and previous.get('input') == record['input'] and os.path.exists(target):
+                    pages[path] = dict(previous, stat=signature)
+                    skipped += 1
+                    continue
+                sheets = _page_stylesheets(path, refs, asset_map, stylesheets, parsed)
+                html = minify_html(inline_critical_css(html, sheets))
+        if write_if_changed(target, html):
+            written += 1
+        record['refs'] = refs
+        pages[path] = record
+    
+    # Remove pages and hashed assets that are no longer produced, with their .gz/.br
+    keep = {ASSET_MANIFEST_NAME}
+    keep.update(asset_map.values())
+    keep.update(pages)
+    removed = 0
+    for path in list(_walk_files(dist_dir)):
+        relative = os.path.relpath(path, dist_dir).replace(os.sep, '/')
+        if relative not in keep and not (is_sibling(relative) and relative[:-3] in keep):
+            os.remove(path)
+            removed += 1
+    
+    write_if_changed(os.path.join(dist_dir, ASSET_MANIFEST_NAME),
+                     json.dumps(asset_map, indent=2, sort_keys=True) + '\n')
+    state = {'version': STATE_VERSION, 'minify': minify, 'assets': assets, 'pages': pages}
+    write_if_changed(STATE_PATH, json.dumps(state, separators=(',', ':'), sort_keys=True))
+    
+    return {
+        'assets': len(assets),
+        'copied': copied,
+        'pages': len(pages),
+        'written': written,
+        'skipped': skipped,
+        'removed': removed,
+    }
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    minify = '--minify' in args
+    if minify:
+        args.remove('--minify')
+    jobs = None
+    if len(args) == 2 and args[0] == '--jobs':
+        jobs = int(args[1])
+    elif args:
+        print("Usage: python3 assets.py [--jobs N] [--minify]")
+        sys.exit(1)
+    stats = build_dist(minify=minify)
+    print(f"✅ Built {DIST_DIR}/: {stats['assets']} assets ({stats['copied']} copied), "
+          f"{stats['pages']} pages and data files ({stats['written']} written, {stats['skipped']} unchanged), "
+          f"{stats['removed']} stale files removed")
+    compressed, current, saved = compress_tree(DIST_DIR, jobs)
+    print(f"🗜️  Precompressed {compressed} files ({current} already current), {saved:,} bytes saved")
+    print(f"📋 Asset manifest: {os.path.join(DIST_DIR, ASSET_MANIFEST_NAME)}")
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Page weight and broken-reference audit for BIO2025 Blog
+
+Parses every generated page (index.html, posts/*.html, page/*.html and
+archive/*.html), resolves each src/href/poster/srcset to a local file, and
+adds up what a reader downloads to open the page: the HTML itself plus the
+stylesheets, scripts, images and media it loads. Links to other pages and
+srcset alternatives are only checked for existence.
+
+Pages heavier than the budget or with references to missing files are
+flagged and the command exits with status 1, so it can gate a deploy. Each
+page's parsed references are cached in .build/audit-cache.json by content
+hash, so a re-run only re-parses pages that changed; file sizes are always
+read fresh.
+
+Usage:
+  python3 audit.py                       # Audit the site with a 2 MB budget per page
+  python3 audit.py --budget 500k         # Flag pages over 500 KiB
+  python3 audit.py --compressed          # Count gzip sizes for HTML/CSS/JS/SVG
+  python3 audit.py --html --jobs 4       # Also write .build/audit.html
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import html
+import stat
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from site_io import write_if_changed
+
+CACHE_PATH = os.path.join('.build', 'audit-cache.json')
+CACHE_VERSION = 1
+REPORT_PATH = os.path.join('.build', 'audit.json')
+HTML_REPORT_PATH = os.path.join('.build', 'audit.html')
+DEFAULT_BUDGET = 2 * 1024 * 1024
+# Heaviest pages printed to the console; the reports list every page
+SHOW_PAGES = 10
+
+PAGE_FILES = ['index.html']
+PAGE_DIRS = ['posts', 'page', 'archive']
+SKIP_NAMES = {'post-template.html'}
+
+# Only these are compressed on the wire (compress.py writes their .gz siblings)
+TEXT_EXTENSIONS = ('.html', '.css', '.js', '.json', '.xml', '.svg', '.txt')
+KINDS = {
+    'css': ('.css',),
+    'js': ('.js',),
+    'images': ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico'),
+    'video': ('.mp4', '.webm', '.mov', '.m4v', '.ogv'),
+    'audio': ('.mp3', '.ogg', '.oga', '.wav', '.m4a', '.flac'),
+}
+# Tags whose src (or poster) the browser downloads to show the page
+LOADED_SOURCES = {'img', 'script', 'video', 'audio', 'source', 'iframe', 'embed', 'track'}
+LOADED_LINKS = {'stylesheet', 'icon', 'preload', 'apple-touch-icon'}
+
+_TAG = re.compile(r'<([a-zA-Z][\w-]*)\b([^>]*)>')
+_ATTRIBUTE = re.compile(r'([\w-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+_EXTERNAL = re.compile(r'^(?:[a-z][a-z0-9+.-]*:|//|#)', re.IGNORECASE)
+_SIZE = re.compile(r'^(\d+(?:\.\d+)?)([km]?)b?$', re.IGNORECASE)
+_UNITS = {'': 1, 'k': 1024, 'm': 1024 * 1024}
+
+def list_pages():
+    """Return every generated HTML page"""
+    pages = [path for path in PAGE_FILES if os.path.isfile(path)]
+    for directory in PAGE_DIRS:
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        pages.extend(f"{directory}/{name}" for name in names
+                     if name.endswith('.html') and name not in SKIP_NAMES)
+    return sorted(pages)
+
+def parse_size(value):
+    """'500k' -> 512000, '2m' -> 2097152, '1500' -> 1500"""
+    match = _SIZE.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * _UNITS[match.group(2).lower()])
+
+def format_size(size):
+    for unit, scale in (('MB', 1024 * 1024), ('KB', 1024)):
+        if size >= scale:
+            return f"{size / scale:.1f} {unit}"
+    return f"{size} B"
+
+def kind_of(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.html':
+        return 'html'
+    for kind, extensions in KINDS.items():
+        if extension in extensions:
+            return kind
+    return 'other'
+
+def resolve(url, page_dir):
+    """The site-relative file a URL points at, or None for external links and fragments"""
+    url = url.strip()
+    if not url or _EXTERNAL.match(url):
+        return None
+    path = unquote(re.split(r'[?#]', url, 1)[0])
+    if not path:
+        return None
+    if path.startswith('/'):
+        target = os.path.normpath(path.lstrip('/') or '.')
+    else:
+        target = os.path.normpath(os.path.join(page_dir, path))
+    if path.endswith('/') or target == '.':
+        target = os.path.join(target, 'index.html')
+    return os.path.normpath(target).replace(os.sep, '/')
+
+def extract_references(content, page_dir):
+    """Return [url, target, loaded] for every local reference in a page
+    
+    loaded is True for resources the browser fetches to show the page, and
+    False for links and srcset alternatives that are only checked to exist.
+    """
+    refs = []
+    seen = set()
+    
+    def add(url, loaded):
+        target = resolve(url, page_dir)
+        if target is None or (url, loaded) in seen:
+            return
+        seen.add((url, loaded))
+        refs.append([url, target, loaded])
+    
+    for tag, attributes in _TAG.findall(content):
+        tag = tag.lower()
+        values = {name.lower(): html.unescape(double or single)
+                  for name, double, single in _ATTRIBUTE.findall(attributes)}
+        if tag == 'link':
+            if 'href' in values:
+                rel = set(values.get('rel', '').lower().split())
+                add(values['href'], bool(rel & LOADED_LINKS))
+            continue
+        if 'src' in values:
+            add(values['src'], tag in LOADED_SOURCES)
+        if 'poster' in values:
+            add(values['poster'], True)
+        if 'href' in values:
+            add(values['href'], False)
+        if 'srcset' in values:
+            for candidate in values['srcset'].split(','):
+                parts = candidate.split()
+                if parts:
+                    add(parts[0], False)
+    return refs
+
+def compressed_size(data):
+    return len(gzip.compress(data, compresslevel=9, mtime=0))
+
+def audit_page(task):
+    """Process pool worker: parse one page's references"""
+    path, digest, compressed = task
+    with open(path, 'rb') as f:
+        data = f.read()
+    entry = {
+        'hash': digest,
+        'bytes': len(data),
+        'refs': extract_references(data.decode('utf-8', errors='replace'), os.path.dirname(path)),
+    }
+    if compressed:
+        entry['gzip'] = compressed_size(data)
+    return path, entry
+
+def hash_page(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _load_cache():
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {'version': CACHE_VERSION, 'pages': {}, 'files': {}}
+
+def file_size(path, files):
+    """Size of a local file, or None if it is missing; files memoizes stats within one audit"""
+    if path not in files:
+        try:
+            info = os.stat(path)
+            # A directory link without an index.html is broken too
+            files[path] = info if stat.S_ISREG(info.st_mode) else None
+        except OSError:
+            files[path] = None
+    info = files[path]
+    return None if info is None else info.st_size
+
+def transfer_size(path, files, cache_files):
+    """gzip size of a text file, raw size of anything else
+    
+    gzip sizes are kept in cache_files between audits, keyed by the file's
+    size and mtime.
+    """
+    info = files[path]
+    if not path.endswith(TEXT_EXTENSIONS):
+        return info.st_size
+    signature = [info.st_size, info.st_mtime_ns]
+    cached = cache_files.get(path)
+    if cached and cached[:2] == signature:
+        return cached[2]
+    with open(path, 'rb') as f:
+        size = compressed_size(f.read())
+    cache_files[path] = signature + [size]
+    return size
+
+def audit_site(budget=DEFAULT_BUDGET, compressed=False, jobs=None):
+    """Audit every generated page; returns the report sorted by page weight
+    
+    Also returns how many pages were re-parsed rather than taken from the cache.
+    """
+    cache = _load_cache()
+    cached_pages = cache['pages']
+    pages = {}
+    todo = []
+    for path in list_pages():
+        digest = hash_page(path)
+        entry = cached_pages.get(path)
+        if entry and entry['hash'] == digest and (not compressed or 'gzip' in entry):
+            pages[path] = entry
+        else:
+            todo.append((path, digest, compressed))
+    
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(todo) <= 1:
+        parsed = [audit_page(task) for task in todo]
+    else:
+        chunksize = max(1, len(todo) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            parsed = list(executor.map(audit_page, todo, chunksize=chunksize))
+    pages.update(parsed)
+    
+    files = {}
+    cache_files = cache['files']
+    results = []
+    for path, entry in pages.items():
+        weights = {'html': entry['gzip'] if compressed else entry['bytes']}
+        resources = []
+        broken = []
+        counted = {path}
+        for url, target, loaded in entry['refs']:
+            size = file_size(target, files)
+            if size is None:
+                broken.append({'url': url, 'path': target})
+            elif loaded and target not in counted:
+                counted.add(target)
+                if compressed:
+                    size = transfer_size(target, files, cache_files)
+                kind = kind_of(target)
+                weights[kind] = weights.get(kind, 0) + size
+                resources.append({'path': target, 'kind': kind, 'bytes': size})
+        weight = sum(weights.values())
+        resources.sort(key=lambda resource: -resource['bytes'])
+        results.append({
+            'page': path,
+            'bytes': weight,
+            'by_kind': weights,
+            'resources': resources,
+            'broken': broken,
+            'over_budget': weight > budget,
+        })
+    results.sort(key=lambda result: (-result['bytes'], result['page']))
+    
+    # Forget pages and files that no longer exist
+    cache['pages'] = pages
+    cache['files'] = {path: value for path, value in cache_files.items() if files.get(path) is not None}
+    write_if_changed(CACHE_PATH, json.dumps(cache, separators=(',', ':'), sort_keys=True))
+    return {
+        'budget': budget,
+        'compressed': compressed,
+        'pages': results,
+    }, len(todo)
+
+def render_html_report(report):
+    """A standalone HTML page listing every page by weight, with its flags and resources"""
+    rows = []
+    for result in report['pages']:
+        flags = []
+        if result['over_budget']:
+            flags.append('over budget')
+        if result['broken']:
+            flags.append(f"{len(result['broken'])} broken")
+        details = ''.join(
+            f"<li>{html.escape(resource['path'])} ({format_size(resource['bytes'])})</li>"
+            for resource in result['resources'])
+        details += ''.join(
+            f"<li class=\"broken\">missing: {html.escape(ref['url'])} → {html.escape(ref['path'])}</li>"
+            for ref in result['broken'])
+        kinds = ', '.join(f"{kind} {format_size(size)}" for kind, size in sorted(result['by_kind'].items()))
+        row_class = ' class="flagged"' if flags else ''
+        rows.append(f'''<tr{row_class}>
+<td>{html.escape(result['page'])}</td>
+<td>{format_size(result['bytes'])}</td>
+<td>{kinds}</td>
+<td>{', '.join(flags)}</td>
+<td><ul>{details}</ul></td>
+</tr>''')
+    sizes = 'gzip' if report['compressed'] else 'uncompressed'
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>BIO2025 Site Audit</title>
+<style>
+body {{ font-family: sans-serif; margin: 2rem; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border-bottom: 1px solid #ddd; padding: 0.4rem; text-align: left; vertical-align: top; }}
+ul {{ margin: 0; padding-left: 1rem; font-size: 0.85rem; }}
+.flagged td {{ background: #fff3f3; }}
+.broken {{ color: #b00; }}
+</style>
+</head>
+<body>
+<h1>Site Audit</h1>
+<p>{len(report['pages'])} pages, budget {format_size(report['budget'])} per page ({sizes} sizes), heaviest first.</p>
+<table>
+<tr><th>Page</th><th>Weight</th><th>Breakdown</th><th>Flags</th><th>Resources</th></tr>
+{chr(10).join(rows)}
+</table>
+</body>
+</html>
+'''
+
+def _option(args, name, default, convert=str):
+    if name not in args:
+        return default
+    i = args.index(name)
+    try:
+        value = convert(args[i + 1])
+    except (IndexError, ValueError):
+        print(f"❌ {name} expects a value")
+        sys.exit(1)
+    del args[i:i + 2]
+    return value
+
+def main():
+    args = sys.argv[1:]
+    compressed = '--compressed' in args
+    write_html = '--html' in args
+    args = [arg for arg in args if arg not in ('--compressed', '--html')]
+    budget = _option(args, '--budget', DEFAULT_BUDGET, parse_size)
+    jobs = _option(args, '--jobs', None, int)
+    if args:
+        print("Usage: python3 audit.py [--budget SIZE] [--compressed] [--html] [--jobs N]")
+        sys.exit(1)
+    
+    report, parsed = audit_site(budget, compressed, jobs)
+    pages = report['pages']
+    if not pages:
+        print("❌ No generated pages found. Run: python3 publish_post.py --all")
+        sys.exit(1)
+    write_if_changed(REPORT_PATH, json.dumps(report, indent=2))
+    if write_html:
+        write_if_changed(HTML_REPORT_PATH, render_html_report(report))
+    
+    sizes = 'gzip' if compressed else 'uncompressed'
+    print(f"📊 Audited {len(pages)} pages ({parsed} parsed, {len(pages) - parsed} cached), "
+          f"budget {format_size(budget)} ({sizes})")
+    print(f"{'Weight':>10}  Page")
+    for result in pages[:SHOW_PAGES]:
+        print(f"{format_size(result['bytes']):>10}  {result['page']}")
+    
+    over = [result for result in pages if result['over_budget']]
+    broken = [result for result in pages if result['broken']]
+    for result in over:
+        heaviest = result['resources'][0] if result['resources'] else None
+        cause = f" (largest: {heaviest['path']}, {format_size(heaviest['bytes'])})" if heaviest else ''
+        print(f"⚠️  {result['page']} is {format_size(result['bytes'])}{cause}")
+    for result in broken:
+        for ref in result['broken']:
+            print(f"❌ {result['page']}: missing {ref['path']} ({ref['url']})")
+    
+    print(f"📋 Report: {REPORT_PATH}" + (f" and {HTML_REPORT_PATH}" if write_html else ''))
+    if over or broken:
+        print(f"💡 {len(over)} pages over budget, {len(broken)} pages with broken references")
+        sys.exit(1)
+    print("✅ Every page is within budget and every reference resolves")
+
+if __name__ == "__main__":
+    main()
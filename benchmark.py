@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Synthetic-corpus benchmarks for the BIO2025 Blog scripts
+
+Each scenario generates N drafts of about S bytes (frontmatter, headings,
+lists, figures, code fences) in a scratch site and times the real pipeline:
+markdown_to_html, a full publish, publishing one post, update_index, post
+listing (cold and warm), post picker search (per keystroke) and
+update_index_after_deletion. Results are written
+as JSON and compared against a stored baseline; a stage that got slower than
+the threshold is reported as a regression and the exit status is 1.
+Usage:
+  python3 benchmark.py                          # Default scenarios, compared with the baseline
+  python3 benchmark.py --scenario 100000x1k     # Posts x draft size (k/m suffixes); repeatable
+  python3 benchmark.py --save-baseline          # Store this run as benchmarks/baseline.json
+  Options: --repeat N, --jobs N, --threshold 0.25, --output PATH, --baseline PATH
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import platform
+import subprocess
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+import post_listing
+from site_io import write_if_changed
+from markdown_engine import BLOCK_CACHE
+from catalog import START_MARKER, END_MARKER
+from templates import POST_TEMPLATE, INDEX_TEMPLATE
+from publish_post import (parse_frontmatter, markdown_to_html, publish_post, publish_many,
+                          update_index, _render_and_write)
+from delete_post import update_index_after_deletion
+from post_picker import build_index as build_post_index
+
+RESULTS_VERSION = 1
+RESULTS_PATH = os.path.join('.build', 'benchmark-results.json')
+# Tracked in git (unlike .build/) so the baseline can be shared and checked in CI
+BASELINE_PATH = os.path.join('benchmarks', 'baseline.json')
+DEFAULT_SCENARIOS = ['100x1k', '1000x1k', '10000x1k', '100x64k', '20x1m']
+DEFAULT_REPEAT = 3
+# Slower than baseline by more than this fraction (and by more than the noise floor) is a regression
+DEFAULT_THRESHOLD = 0.25
+NOISE_FLOOR_SECONDS = 0.005
+
+_SCENARIO = re.compile(r'^(\d+)x(\d+)([km]?)$', re.IGNORECASE)
+_UNITS = {'': 1, 'k': 1024, 'm': 1024 * 1024}
+
+WORDS = (
+    "biotech pipeline clinical trial partnership licensing oncology antibody platform "
+    "regulatory approval investors keynote panel booth venture capital therapeutics "
+    "manufacturing biologics gene therapy cell data readout endpoint cohort patients "
+    "market strategy startup acquisition discovery target molecule assay protein"
+).split()
+
+def parse_scenario(text):
+    """'1000x4k' -> (1000, 4096)"""
+    match = _SCENARIO.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid scenario '{text}', expected POSTSxSIZE such as 1000x4k")
+    return int(match.group(1)), int(match.group(2)) * _UNITS[match.group(3).lower()]
+
+def _sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+def _section(rng, number):
+    """One chunk of Markdown exercising a different block type each time"""
+    kind = number % 5
+    if kind == 0:
+        return f"## {_sentence(rng, 4)[:-1]}\n\n{_sentence(rng)} {_sentence(rng)}"
+    if kind == 1:
+        return (f"{_sentence(rng)} Some **bold {rng.choice(WORDS)}**, *emphasis* and "
+                f"`inline_code()` with a [link](https://example.com/{rng.choice(WORDS)}). {_sentence(rng)}")
+    if kind == 2:
+        return '\n'.join(f"- {_sentence(rng, 6)}" for _ in range(rng.randint(3, 6)))
+    if kind == 3:
+        return (f"![{rng.choice(WORDS)}](../media/images/photo-{number % 7}.jpg)\n"
+                f"*{_sentence(rng, 6)}*")
+    lines = '\n'.join(f"    value_{i} = compute('{rng.choice(WORDS)}', {i})" for i in range(rng.randint(3, 8)))
+    return f"```python\ndef example():\n{lines}\n```"
+
+def generate_draft(rng, number, size):
+    """Return a draft of roughly size bytes with realistic frontmatter"""
+    day = date(2023, 1, 1) + timedelta(days=rng.randrange(3 * 365))
+    parts = [
+        '---',
+        f"title: {_sentence(rng, 5)[:-1]} {number}",
+        f"date: {day.isoformat()}",
+        f"excerpt: {_sentence(rng, 10)}",
+        '---',
+        '',
+    ]
+    length = sum(len(part) + 1 for part in parts)
+    section = 0
+    while length < size:
+        chunk = _section(rng, section)
+        parts.append(chunk + '\n')
+        length += len(chunk) + 2
+        section += 1
+    return '\n'.join(parts)
+
+def create_site(root, posts, size, seed=2025):
+    """Lay out a scratch site with an empty index, the page templates and a generated corpus"""
+    with open('index.html', 'r', encoding='utf-8') as f:
+        content = f.read()
+    start = content.find(START_MARKER)
+    end = content.find(END_MARKER)
+    content = content[:start] + START_MARKER + '\n\n' + content[end:]
+    write_if_changed(os.path.join(root, 'index.html'), content)
+    
+    rng = random.Random(seed)
+    drafts = os.path.join(root, 'drafts')
+    os.makedirs(drafts)
+    os.makedirs(os.path.join(root, 'posts'))
+    for template in (POST_TEMPLATE, INDEX_TEMPLATE):
+        shutil.copyfile(template, os.path.join(root, template))
+    slugs = []
+    total = 0
+    for number in range(posts):
+        slug = f"bench-post-{number:06d}"
+        draft = generate_draft(rng, number, size)
+        with open(os.path.join(drafts, f"{slug}.md"), 'w', encoding='utf-8') as f:
+            f.write(draft)
+        slugs.append(slug)
+        total += len(draft)
+    return slugs, total
+
+def _timed(func, repeat, setup=None):
+    """Best wall time of repeat runs of func, with setup run untimed before each"""
+    best = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+def _reset_listing_cache():
+    post_listing._cache = None
+    post_listing._cache_dirty = False
+
+def run_scenario(posts, size, repeat, jobs):
+    """Generate one corpus and time every stage, returning {stage: result}"""
+    stages = {}
+    cwd = os.getcwd()
+    root = tempfile.mkdtemp(prefix='bio2025-bench-')
+    quiet = io.StringIO()
+    try:
+        slugs, corpus_bytes = create_site(root, posts, size)
+        os.chdir(root)
+        _reset_listing_cache()
+    
+        bodies = []
+        for slug in slugs:
+            with open(os.path.join('drafts', f"{slug}.md"), 'r', encoding='utf-8') as f:
+                bodies.append(parse_frontmatter(f.read())[1])
+    
+        def render_all():
+            for body in bodies:
+                markdown_to_html(body)
+        stages['markdown_to_html'] = {
+            'seconds': _timed(render_all, repeat, BLOCK_CACHE.clear),
+            'items': posts, 'bytes': corpus_bytes,
+        }
+    
+        # The full build is by far the slowest stage, so it only runs once
+        BLOCK_CACHE.clear()
+        with redirect_stdout(quiet):
+            stages['publish_all'] = {
+                'seconds': _timed(lambda: publish_many(slugs, jobs, force=True), 1),
+                'items': posts, 'bytes': corpus_bytes,
+            }
+    
+        slug = slugs[len(slugs) // 2]
+        with redirect_stdout(quiet):
+            stages['publish_post'] = {
+                'seconds': _timed(lambda: publish_post(slug, force=True), repeat),
+                'items': 1,
+            }
+            post = _render_and_write(slug)
+            stages['update_index'] = {
+                'seconds': _timed(lambda: update_index([post]), repeat),
+                'items': posts,
+            }
+    
+        cache_path = post_listing.LISTING_CACHE_PATH
+    
+        def cold_listing():
+            _reset_listing_cache()
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+        stages['get_existing_posts_cold'] = {
+            'seconds': _timed(post_listing.get_existing_posts, repeat, cold_listing),
+            'items': posts * 2,
+        }
+        stages['get_existing_posts_warm'] = {
+            'seconds': _timed(post_listing.get_existing_posts, repeat, _reset_listing_cache),
+            'items': posts * 2,
+        }
+        # Typing a post's title one key at a time, as the edit/delete picker does
+        index = build_post_index()
+        title = index.posts[len(index) // 2][3] or slug
+        keystrokes = [title[:i] for i in range(1, min(len(title), 24) + 1)]
+        
+        def type_query():
+            for query in keystrokes:
+                index.search(query)
+        stages['post_picker_search'] = {
+            'seconds': _timed(type_query, repeat),
+            'items': len(keystrokes),
+        }
+        with redirect_stdout(quiet):
+            stages['list_posts'] = {
+                'seconds': _timed(post_listing.list_posts, repeat, _reset_listing_cache),
+                'items': posts * 2,
+            }
+            # Each run deletes the same post, so it is re-listed untimed first
+            stages['update_index_after_deletion'] = {
+                'seconds': _timed(lambda: update_index_after_deletion(slug), repeat,
+                                  lambda: update_index([post])),
+                'items': posts,
+            }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+        _reset_listing_cache()
+        BLOCK_CACHE.clear()
+    return stages
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold):
+    """Return (scenario, stage, baseline seconds, seconds, ratio) for every regressed stage"""
+    regressions = []
+    for name, scenario in results['scenarios'].items():
+        old_stages = baseline.get('scenarios', {}).get(name, {}).get('stages', {})
+        for stage, result in scenario['stages'].items():
+            old = old_stages.get(stage)
+            if not old or old['seconds'] <= 0:
+                continue
+            seconds = result['seconds']
+            ratio = seconds / old['seconds']
+            if ratio > 1 + threshold and seconds - old['seconds'] > NOISE_FLOOR_SECONDS:
+                regressions.append((name, stage, old['seconds'], seconds, ratio))
+    return regressions
+
+def _format_stage(result, old=None):
+    line = f"{result['seconds'] * 1000:10.1f} ms"
+    if result['seconds'] > 0:
+        if result.get('bytes'):
+            line += f"  {result['bytes'] / result['seconds'] / 1e6:8.1f} MB/s"
+        else:
+            line += f"  {result['items'] / result['seconds']:8,.0f} items/s"
+    if old and old['seconds'] > 0:
+        line += f"  ({result['seconds'] / old['seconds']:.2f}x baseline)"
+    return line
+
+def _option(args, name, default, convert=str):
+    if name not in args:
+        return default
+    i = args.index(name)
+    try:
+        value = convert(args[i + 1])
+    except (IndexError, ValueError):
+        print(f"❌ {name} expects a value")
+        sys.exit(1)
+    del args[i:i + 2]
+    return value
+
+def main():
+    args = sys.argv[1:]
+    save_baseline = '--save-baseline' in args
+    args = [arg for arg in args if arg != '--save-baseline']
+    scenarios = []
+    while '--scenario' in args:
+        scenarios.append(_option(args, '--scenario', None))
+    repeat = max(1, _option(args, '--repeat', DEFAULT_REPEAT, int))
+    jobs = _option(args, '--jobs', None, int)
+    threshold = _option(args, '--threshold', DEFAULT_THRESHOLD, float)
+    output = _option(args, '--output', RESULTS_PATH)
+    baseline_path = _option(args, '--baseline', BASELINE_PATH)
+    if args:
+        print("Usage: python3 benchmark.py [--scenario POSTSxSIZE ...] [--repeat N] [--jobs N] "
+              "[--threshold F] [--output PATH] [--baseline PATH] [--save-baseline]")
+        sys.exit(1)
+    
+    try:
+        parsed = [(name, *parse_scenario(name)) for name in scenarios or DEFAULT_SCENARIOS]
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    
+    results = {
+        'version': RESULTS_VERSION,
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': repeat,
+        'scenarios': {},
+    }
+    for name, posts, size in parsed:
+        print(f"📊 {name}: {posts:,} posts of ~{size:,} bytes")
+        start = time.perf_counter()
+        stages = run_scenario(posts, size, repeat, jobs)
+        results['scenarios'][name] = {'posts': posts, 'size': size, 'stages': stages}
+        old_stages = baseline.get('scenarios', {}).get(name, {}).get('stages', {})
+        for stage, result in stages.items():
+            print(f"   {stage:<30}{_format_stage(result, old_stages.get(stage))}")
+        print(f"   ({time.perf_counter() - start:.1f}s including corpus generation)")
+    
+    write_if_changed(output, json.dumps(results, indent=2) + '\n')
+    print(f"📋 Results: {output}")
+    if save_baseline:
+        write_if_changed(baseline_path, json.dumps(results, indent=2) + '\n')
+        print(f"✅ Saved baseline: {baseline_path}")
+        return
+    if not baseline:
+        print(f"💡 No baseline at {baseline_path}; run with --save-baseline to create one")
+        return
+    
+    regressions = compare(results, baseline, threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} stage(s) regressed by more than {threshold:.0%} "
+              f"against baseline {baseline.get('commit') or baseline_path}:")
+        for name, stage, old, new, ratio in regressions:
+            print(f"   {name} {stage}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms ({ratio:.2f}x)")
+        sys.exit(1)
+    print(f"✅ No regressions against baseline {baseline.get('commit') or baseline_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Persistent build manifest for BIO2025 Blog incremental builds
+Records, per draft, a hash of its bytes, its frontmatter, the hash of the generated HTML
+and the other inputs it was rendered from (see deps.py)
+"""
+
+import hashlib
+import json
+import os
+
+from site_io import write_if_changed, file_lock
+
+MANIFEST_PATH = os.path.join(".build", "manifest.json")
+
+# Bump when the renderer output changes so every post is rebuilt once
+MANIFEST_VERSION = 3
+
+def hash_bytes(data):
+    """Return the hex content hash used throughout the manifest"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(filepath):
+    """hash_bytes of a file's contents, read in chunks so large drafts are never held whole"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(path=MANIFEST_PATH, renderer=None):
+    """Load the manifest, starting fresh if it is missing, unreadable or outdated
+    
+    Switching renderer (e.g. the markdown engine) invalidates every record.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    
+    if (not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION
+            or manifest.get('renderer') != renderer):
+        manifest = {'version': MANIFEST_VERSION, 'renderer': renderer, 'posts': {}}
+    return manifest
+
+def save_manifest(manifest, path=MANIFEST_PATH, removed=()):
+    """Persist the manifest (sorted keys keep it stable between runs)
+    
+    Another publish may have saved since this one loaded, so the two are
+    merged under the site lock: where they disagree about a post, the record
+    matching the HTML file now on disk wins. Slugs in removed (deleted
+    posts) are dropped from both.
+    """
+    removed = set(removed)
+    with file_lock():
+        current = load_manifest(path, manifest.get('renderer'))
+        posts = current['posts']
+        for slug, entry in manifest['posts'].items():
+            other = posts.get(slug)
+            if other is None or (other != entry and _stat_signature(entry['output']) == entry.get('html_stat')):
+                posts[slug] = entry
+        for slug in removed:
+            posts.pop(slug, None)
+        manifest['posts'] = posts
+        write_if_changed(path, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+
+def forget_posts(slugs, path=MANIFEST_PATH):
+    """Drop deleted posts from the manifest, whichever renderer it was built with"""
+    with file_lock():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                renderer = json.load(f).get('renderer')
+        except (OSError, ValueError, AttributeError):
+            return
+        manifest = load_manifest(path, renderer)
+        if any(slug in manifest['posts'] for slug in slugs):
+            save_manifest(manifest, path, removed=slugs)
+
+def _stat_signature(filepath):
+    """Return (size, mtime_ns) for filepath, or None if it does not exist"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+def check_draft(manifest, slug, md_filepath, html_filepath):
+    """Decide whether a draft needs rendering.
+    
+    Returns (changed, draft_hash). An unchanged stat signature skips hashing
+    entirely; otherwise the draft bytes are hashed and compared.
+    """
+    entry = manifest['posts'].get(slug)
+    draft_stat = _stat_signature(md_filepath)
+    
+    # Output missing or touched by hand: always rebuild
+    if entry is None or _stat_signature(html_filepath) != entry.get('html_stat'):
+        return True, None
+    
+    if draft_stat == entry.get('draft_stat'):
+        return False, entry['draft_hash']
+    
+    draft_hash = hash_file(md_filepath)
+    
+    if draft_hash == entry.get('draft_hash'):
+        # Content is the same (e.g. the file was only touched), refresh the stat
+        entry['draft_stat'] = draft_stat
+        return False, draft_hash
+    return True, draft_hash
+
+def record_post(manifest, slug, md_filepath, html_filepath, frontmatter, html_hash, draft_hash=None, inputs=None):
+    """Store the build record for a freshly rendered post"""
+    if draft_hash is None:
+        draft_hash = hash_file(md_filepath)
+    
+    manifest['posts'][slug] = {
+        'draft': md_filepath,
+        'draft_hash': draft_hash,
+        'draft_stat': _stat_signature(md_filepath),
+        'frontmatter': frontmatter,
+        'output': html_filepath,
+        'html_hash': html_hash,
+        'html_stat': _stat_signature(html_filepath),
+        'inputs': inputs or {},
+    }
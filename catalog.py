@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Post catalog for BIO2025 Blog
+
+catalog.json maps each published slug to its title, date, excerpt and output
+path. It is the source of truth for the index.html post list: publish and
+delete update the catalog, then the list is rendered from it in one pass.
+index.html shows the newest posts; older ones go to page/<n>.html, and every
+post is listed in archive/<year>.html. The newest posts also go to the Atom
+feed, feed.xml (see feed.py).
+Publishes and deletes queue their catalog changes and flush_index_changes()
+applies every queued change in one pass under the site lock, so concurrent
+publishes never lose each other's entries.
+Usage:
+  python3 catalog.py                  # Re-render index.html and pages from catalog.json
+  python3 catalog.py --page-size 20   # Change the number of posts per page
+"""
+
+import os
+import re
+import sys
+import json
+from datetime import datetime
+
+from site_io import write_if_changed, file_lock, enqueue, drain
+from feed import FEED_PATH, write_feed
+from templates import INDEX_TEMPLATE, load_template
+from search_index import load_docs, apply_changes as apply_search_changes
+import profiling
+
+CATALOG_PATH = 'catalog.json'
+CATALOG_VERSION = 1
+INDEX_PATH = 'index.html'
+PAGE_DIR = 'page'
+ARCHIVE_DIR = 'archive'
+INDEX_QUEUE = 'index'
+# Posts per listing page; catalog.json's page_size or BIO2025_PAGE_SIZE override it
+DEFAULT_PAGE_SIZE = 10
+_warned_settings = set()
+
+START_MARKER = '<!-- Posts will be listed here chronologically -->'
+END_MARKER = '<!-- Add new posts here - newest first -->'
+
+def new_catalog():
+    """Return an empty catalog"""
+    return {'version': CATALOG_VERSION, 'posts': {}}
+
+def load_catalog(path=CATALOG_PATH, index_path=INDEX_PATH):
+    """Load the catalog, bootstrapping it from the generated listing pages the first time
+    
+    index.html only lists the newest page of posts, so page/<n>.html and
+    archive/<year>.html are read too; otherwise the older posts would be
+    dropped from the catalog and their pages deleted on the next render.
+    """
+    if not os.path.exists(path):
+        catalog = new_catalog()
+        for listing_path in _listing_pages(index_path):
+            with open(listing_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            for entry in read_index_entries(content):
+                slug = entry.pop('slug')
+                catalog['posts'].setdefault(slug, entry)
+        return catalog
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    if catalog.get('version') != CATALOG_VERSION:
+        raise ValueError(f"Unsupported catalog version in {path}: {catalog.get('version')}")
+    return catalog
+
+def _listing_pages(index_path=INDEX_PATH):
+    """index.html followed by every generated page/<n>.html and archive/<year>.html"""
+    paths = [index_path] if os.path.exists(index_path) else []
+    root = os.path.dirname(index_path)
+    for directory, pattern in ((PAGE_DIR, r'\d+\.html'), (ARCHIVE_DIR, r'\d{4}\.html')):
+        directory = os.path.join(root, directory)
+        if os.path.isdir(directory):
+            paths.extend(os.path.join(directory, filename) for filename in sorted(os.listdir(directory))
+                         if re.fullmatch(pattern, filename))
+    return paths
+
+def save_catalog(catalog, path=CATALOG_PATH):
+    """Write the catalog newest first so diffs stay small and renders start sorted"""
+    data = {'version': CATALOG_VERSION}
+    for setting in ('page_size', 'feed_entries', 'site_url'):
+        if setting in catalog:
+            data[setting] = catalog[setting]
+    data['posts'] = {slug: catalog['posts'][slug] for slug in sorted_slugs(catalog)}
+    return write_if_changed(path, json.dumps(data, indent=2, ensure_ascii=False) + '\n')
+
+def upsert_post(catalog, slug, title, date_str, excerpt, output=None, updated=None):
+    """Add or replace the catalog entry for slug
+    
+    updated is the time the post's HTML last changed; when None the previous
+    value is kept, so republishing an unchanged post leaves the feed alone.
+    """
+    entry = {
+        'title': title,
+        'date': date_str,
+        'excerpt': excerpt,
+        'output': output or f"posts/{slug}.html",
+    }
+    updated = updated or catalog['posts'].get(slug, {}).get('updated')
+    if updated:
+        entry['updated'] = updated
+    catalog['posts'][slug] = entry
+
+def remove_post(catalog, slug):
+    """Drop slug from the catalog, returning True if it was listed"""
+    return catalog['posts'].pop(slug, None) is not None
+
+def sorted_slugs(catalog):
+    """Slugs newest first; same-day posts keep their catalog order"""
+    # The catalog is saved in this order, so this is a near-linear pass
+    posts = catalog['posts']
+    return sorted(posts, key=lambda slug: posts[slug]['date'], reverse=True)
+
+def format_index_item(href, title, formatted_date, excerpt):
+    """Build the index.html <article> snippet for one post"""
+    return f'''            <article class="post-item">
+                <h3><a href="{href}">{title}</a></h3>
+                <p class="post-meta">{formatted_date}</p>
+                <p class="post-excerpt">{excerpt}</p>
+            </article>
+'''
+
+def read_index_entries(content):
+    """Parse the post listings in index.html or a listing page one directory below it"""
+    entries = []
+    pattern = (r'<article class="post-item">\s*<h3><a href="(?:\.\./)?(posts/([^"]+?)(?:\.html)?)">(.*?)</a></h3>\s*'
+               r'<p class="post-meta">(.*?)</p>\s*<p class="post-excerpt">(.*?)</p>\s*</article>')
+    for match in re.finditer(pattern, content, re.DOTALL):
+        output, slug, title, formatted_date, excerpt = match.groups()
+        try:
+            date_str = datetime.strptime(formatted_date, "%B %d, %Y").strftime("%Y-%m-%d")
+        except ValueError:
+            date_str = ''
+        entries.append({
+            'slug': slug,
+            'title': title,
+            'date': date_str,
+            'excerpt': excerpt,
+            'output': output,
+        })
+    return entries
+
+def page_size(catalog):
+    """Return the configured number of posts per listing page
+    
+    BIO2025_PAGE_SIZE wins over catalog.json's page_size. A value that is not
+    a positive whole number is ignored with a warning (printed once).
+    """
+    for source, value in (('BIO2025_PAGE_SIZE', os.environ.get('BIO2025_PAGE_SIZE')),
+                          (f"page_size in {CATALOG_PATH}", catalog.get('page_size'))):
+        if value is None or value == '':
+            continue
+        try:
+            size = int(value)
+        except (TypeError, ValueError):
+            size = 0
+        if size >= 1:
+            return size
+        if (source, value) not in _warned_settings:
+            _warned_settings.add((source, value))
+            print(f"⚠️  Warning: {source} must be a positive whole number, got {value!r}; ignoring it.")
+    return DEFAULT_PAGE_SIZE
+
+def format_navigation(links):
+    """Build a post-navigation bar from (href, label) pairs"""
+    if not links:
+        return ''
+    anchors = ''.join(f'                <a href="{href}">{label}</a>\n' for href, label in links)
+    return f'            <nav class="post-navigation">\n{anchors}            </nav>\n'
+
+def format_listing_page(title, heading, items, navigation):
+    """Build a standalone listing page from index-template.html (one directory below the site root)"""
+    post_list = ''.join(item + '\n' for item in items) + navigation
+    return load_template(INDEX_TEMPLATE).render(title=title, heading=heading, post_list=post_list)
+
+def _format_items(catalog, slugs, prefix=''):
+    """Format the index items for slugs, prefixing each link for pages in subdirectories"""
+    items = []
+    for slug in slugs:
+        post = catalog['posts'][slug]
+        formatted_date = datetime.strptime(post['date'], "%Y-%m-%d").strftime("%B %d, %Y")
+        items.append(format_index_item(prefix + post['output'], post['title'], formatted_date, post['excerpt']))
+    return items
+
+def _page_links(number, page_count, years, root):
+    """Newer/older and archive links for listing page number, relative to root"""
+    links = []
+    if number == 2:
+        links.append((f"{root}index.html", "← Newer posts"))
+    elif number > 2:
+        links.append((f"{root}{PAGE_DIR}/{number - 1}.html", "← Newer posts"))
+    if number < page_count:
+        links.append((f"{root}{PAGE_DIR}/{number + 1}.html", "Older posts →"))
+    links.extend((f"{root}{ARCHIVE_DIR}/{year}.html", year) for year in years)
+    return links
+
+def render_post_list(catalog, slugs, navigation=''):
+    """Render the index.html post list section, markers included"""
+    items = _format_items(catalog, slugs)
+    return (START_MARKER + '\n\n' + ''.join(item + '\n' for item in items) + navigation
+            + '            ' + END_MARKER)
+
+def _remove_stale(directory, keep, pattern):
+    """Delete generated pages in directory that are no longer produced"""
+    removed = []
+    if not os.path.isdir(directory):
+        return removed
+    for filename in os.listdir(directory):
+        if re.fullmatch(pattern, filename) and filename not in keep:
+            os.remove(os.path.join(directory, filename))
+            removed.append(os.path.join(directory, filename))
+    return removed
+
+def render_index(catalog, index_path=INDEX_PATH):
+    """Regenerate index.html, page/<n>.html, archive/<year>.html and feed.xml from the catalog
+
+    Every page is rendered but only pages whose bytes change are rewritten.
+    Returns the list of written or removed paths, or None if index.html is
+    missing its post list markers.
+    """
+    with open(index_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    start = content.find(START_MARKER)
+    end = content.find(END_MARKER)
+    if start == -1 or end == -1 or end < start:
+        print(f"⚠️  Warning: {index_path} is missing the post list markers, cannot rebuild index.")
+        return None
+    
+    root = os.path.dirname(index_path)
+    slugs = sorted_slugs(catalog)
+    size = page_size(catalog)
+    pages = [slugs[i:i + size] for i in range(0, len(slugs), size)] or [[]]
+    
+    by_year = {}
+    for slug in slugs:
+        year = catalog['posts'][slug]['date'][:4]
+        if year:
+            by_year.setdefault(year, []).append(slug)
+    years = list(by_year)
+    
+    # Navigation only appears once there is more than one page, so small sites are unchanged
+    changed = []
+    navigation = format_navigation(_page_links(1, len(pages), years, '')) if len(pages) > 1 else ''
+    content = content[:start] + render_post_list(catalog, pages[0], navigation) + content[end + len(END_MARKER):]
+    if write_if_changed(index_path, content):
+        changed.append(index_path)
+    
+    page_files = set()
+    for number, page in enumerate(pages[1:], 2):
+        filename = f"{number}.html"
+        page_files.add(filename)
+        path = os.path.join(root, PAGE_DIR, filename)
+        html = format_listing_page(
+            f"Page {number}", f"Page {number}", _format_items(catalog, page, '../'),
+            format_navigation(_page_links(number, len(pages), years, '../')))
+        if write_if_changed(path, html):
+            changed.append(path)
+    
+    archive_files = set()
+    for year, year_slugs in by_year.items():
+        filename = f"{year}.html"
+        archive_files.add(filename)
+        path = os.path.join(root, ARCHIVE_DIR, filename)
+        links = [("../index.html", "← Back to Blog")]
+        links.extend((f"{other}.html", other) for other in years if other != year)
+        html = format_listing_page(
+            f"{year} Archive", f"Posts from {year}", _format_items(catalog, year_slugs, '../'),
+            format_navigation(links))
+        if write_if_changed(path, html):
+            changed.append(path)
+    
+    changed.extend(_remove_stale(os.path.join(root, PAGE_DIR), page_files, r'\d+\.html'))
+    changed.extend(_remove_stale(os.path.join(root, ARCHIVE_DIR), archive_files, r'\d{4}\.html'))
+    
+    feed_path = os.path.join(root, FEED_PATH)
+    if write_feed(catalog, slugs, feed_path):
+        changed.append(feed_path)
+    return changed
+
+def queue_index_changes(posts=(), removals=()):
+    """Queue catalog changes for the next flush_index_changes()
+    
+    posts are dicts with slug, title, date, excerpt, output, updated (or None)
+    and the post's search term scores; removals is a list of slugs.
+    """
+    enqueue(INDEX_QUEUE, {'posts': list(posts), 'removals': list(removals)})
+
+def flush_index_changes(index_path=INDEX_PATH):
+    """Apply every queued change with one catalog save, index render and search index update
+    
+    Runs under the site lock, so when several publishes finish at once the
+    first to get the lock flushes everyone's changes and the rest find the
+    queue empty. Returns render_index's result, or [] if nothing was queued.
+    """
+    with file_lock(), drain(INDEX_QUEUE) as batches:
+        if not batches:
+            return []
+        with profiling.stage('catalog'):
+            catalog = load_catalog(index_path=index_path)
+            updates = {}
+            removals = set()
+            for batch in batches:
+                for post in batch['posts']:
+                    upsert_post(catalog, post['slug'], post['title'], post['date'], post['excerpt'],
+                                post['output'], post['updated'])
+                    updates[post['slug']] = post
+                    removals.discard(post['slug'])
+                for slug in batch['removals']:
+                    remove_post(catalog, slug)
+                    updates.pop(slug, None)
+                    removals.add(slug)
+            save_catalog(catalog)
+        with profiling.stage('render_index'):
+            changed = render_index(catalog, index_path)
+        with profiling.stage('search_index'):
+            apply_search_changes(load_docs(), [dict(post, url=post['output']) for post in updates.values()],
+                                 sorted(removals))
+        return changed
+
+if __name__ == "__main__":
+    size = None
+    if len(sys.argv) == 3 and sys.argv[1] == '--page-size':
+        try:
+            size = int(sys.argv[2])
+        except ValueError:
+            size = 0
+        if size < 1:
+            print(f"❌ --page-size must be a positive whole number, got {sys.argv[2]!r}")
+            sys.exit(1)
+    elif len(sys.argv) != 1:
+        print("Usage: python3 catalog.py [--page-size N]")
+        sys.exit(1)
+    
+    with file_lock():
+        catalog = load_catalog()
+        if size is not None:
+            catalog['page_size'] = size
+        save_catalog(catalog)
+        changed = render_index(catalog)
+    if changed is None:
+        sys.exit(1)
+    posts = len(catalog['posts'])
+    if changed:
+        print(f"✅ Rebuilt {len(changed)} listing page(s) from {CATALOG_PATH} ({posts} posts)")
+        for path in changed:
+            print(f"   {path}")
+    else:
+        print(f"✅ Listing pages are already up to date ({posts} posts)")
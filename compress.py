@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Precompressed .gz/.br siblings for static hosting
+
+Writes file.html.gz (and file.html.br when the brotli module is installed)
+next to every HTML, CSS, JS, JSON, XML and SVG file in the build output, at
+maximum compression, so a static server (nginx gzip_static/brotli_static,
+Caddy precompressed, ...) never compresses at request time. Each sibling
+gets its source's mtime, so unchanged outputs are skipped with a stat.
+Usage: python3 compress.py [--jobs N]    # Compress dist/
+"""
+
+import os
+import sys
+import gzip
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_EXTENSIONS = ('.html', '.css', '.js', '.json', '.xml', '.svg', '.txt')
+SIBLING_EXTENSIONS = ('.gz', '.br')
+
+def _encodings():
+    encodings = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encodings.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    return encodings
+
+def is_sibling(path):
+    """True for a .gz/.br file written by this stage"""
+    return path.endswith(SIBLING_EXTENSIONS) and path[:-3].endswith(COMPRESS_EXTENSIONS)
+
+def _is_current(path, stat):
+    """A sibling is current if it carries the source's mtime"""
+    for extension, _ in _encodings():
+        try:
+            if os.stat(path + extension).st_mtime_ns != stat.st_mtime_ns:
+                return False
+        except FileNotFoundError:
+            return False
+    return True
+
+def compress_file(path):
+    """Process pool worker: write every sibling of one file, returning bytes saved"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    stat = os.stat(path)
+    saved = 0
+    for extension, encode in _encodings():
+        sibling = path + extension
+        compressed = encode(data)
+        tmp_path = sibling + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, sibling)
+        saved += len(data) - len(compressed)
+    return saved
+
+def compress_tree(root, jobs=None):
+    """Compress every changed output under root in parallel
+    
+    Returns (files compressed, files already current, bytes saved).
+    """
+    todo = []
+    current = 0
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append(entry.path)
+                elif entry.name.endswith(COMPRESS_EXTENSIONS):
+                    if _is_current(entry.path, entry.stat()):
+                        current += 1
+                    else:
+                        todo.append(entry.path)
+    
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(todo) <= 1:
+        saved = [compress_file(path) for path in todo]
+    else:
+        chunksize = max(1, len(todo) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            saved = list(executor.map(compress_file, todo, chunksize=chunksize))
+    return len(todo), current, sum(saved)
+
+if __name__ == "__main__":
+    from assets import DIST_DIR
+    
+    jobs = None
+    if len(sys.argv) == 3 and sys.argv[1] == '--jobs':
+        jobs = int(sys.argv[2])
+    elif len(sys.argv) != 1:
+        print("Usage: python3 compress.py [--jobs N]")
+        sys.exit(1)
+    if not os.path.isdir(DIST_DIR):
+        print(f"❌ {DIST_DIR}/ not found. Run: python3 assets.py")
+        sys.exit(1)
+    
+    compressed, current, saved = compress_tree(DIST_DIR, jobs)
+    formats = 'gzip + brotli' if brotli is not None else 'gzip (pip install brotli for .br)'
+    print(f"✅ Compressed {compressed} files, {current} already current ({formats}), {saved:,} bytes saved")
@@ -1,98 +1,33 @@
 #!/usr/bin/env python3
 """
 Script to delete a blog post and update the index
+Usage:
+  python3 delete_post.py                              # Pick a post interactively (search as you type)
+  python3 delete_post.py post-slug                    # Delete one post
+  python3 delete_post.py slug-one slug-two ...        # Delete several posts at once
+  python3 delete_post.py --glob 'bio2024-*'           # Delete every post whose slug matches
+  python3 delete_post.py --before 2024-01-01          # Delete every post dated before the cutoff
+  Bulk deletes ask for one confirmation (--yes skips it) and regenerate the index once.
+  --before also narrows explicit slugs and --glob matches.
 """
 
 import os
 import sys
-import re
+import fnmatch
 from datetime import datetime
 
-def get_existing_posts():
-    """Get list of existing posts"""
-    posts = []
-    posts_dir = "posts"
-    drafts_dir = "drafts"
-    
-    # Check posts directory for HTML files
-    if os.path.exists(posts_dir):
-        for filename in os.listdir(posts_dir):
-            if filename.endswith('.html') and filename != 'post-template.html':
-                slug = filename[:-5]  # Remove .html extension
-                posts.append(('published', slug, os.path.join(posts_dir, filename)))
-    
-    # Check drafts directory for markdown files
-    if os.path.exists(drafts_dir):
-        for filename in os.listdir(drafts_dir):
-            if filename.endswith('.md') and filename != 'README.md':
-                slug = filename[:-3]  # Remove .md extension
-                posts.append(('draft', slug, os.path.join(drafts_dir, filename)))
-    
-    return posts
-
-def extract_title_from_html(filepath):
-    """Extract title from HTML file"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Look for <h1> tag in the article
-            match = re.search(r'<article[^>]*>.*?<h1[^>]*>(.*?)</h1>', content, re.DOTALL)
-            if match:
-                return match.group(1).strip()
-    except Exception:
-        pass
-    return None
-
-def extract_title_from_markdown(filepath):
-    """Extract title from markdown file"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Look for title in frontmatter
-            frontmatter_match = re.search(r'^---\s*\n(.*?)\n---', content, re.DOTALL)
-            if frontmatter_match:
-                frontmatter = frontmatter_match.group(1)
-                title_match = re.search(r'^title:\s*(.+)$', frontmatter, re.MULTILINE)
-                if title_match:
-                    return title_match.group(1).strip()
-            
-            # Look for first # header
-            header_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-            if header_match:
-                return header_match.group(1).strip()
-    except Exception:
-        pass
-    return None
-
-def list_posts():
-    """List all existing posts"""
-    posts = get_existing_posts()
-    
-    if not posts:
-        print("No existing posts found.")
-        return None
-    
-    print("\nExisting posts:")
-    print("-" * 50)
-    
-    for i, (status, slug, filepath) in enumerate(posts, 1):
-        if status == 'published':
-            title = extract_title_from_html(filepath)
-        else:
-            title = extract_title_from_markdown(filepath)
-        
-        title_display = title if title else slug
-        status_display = "📝 DRAFT" if status == 'draft' else "✅ PUBLISHED"
-        
-        print(f"{i:2d}. {status_display} - {title_display}")
-        print(f"    Slug: {slug}")
-        print(f"    File: {filepath}")
-        print()
-    
-    return posts
+from post_listing import (get_existing_posts, list_posts, list_post_titles, extract_title_from_html,
+                          extract_title_from_markdown, extract_date_from_markdown)
+from catalog import load_catalog, queue_index_changes, flush_index_changes
+from build_manifest import forget_posts
+from post_picker import can_pick, pick_post
 
 def update_index_after_deletion(deleted_slug):
-    """Update index.html after deleting a post"""
+    """Remove a post from the catalog and regenerate index.html"""
+    update_index_after_deletions([deleted_slug])
+
+def update_index_after_deletions(deleted_slugs):
+    """Remove posts from the catalog and regenerate index.html once for all of them"""
     index_file = "index.html"
     
     if not os.path.exists(index_file):
@@ -100,34 +35,14 @@ def update_index_after_deletion(deleted_slug):
         return
     
     try:
-        with open(index_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Remove the post entry from the index
-        # Look for the article post-item pattern that contains the specific post
-        pattern = rf'            <article class="post-item">.*?<a href="posts/{re.escape(deleted_slug)}\.html"[^>]*>.*?</article>\s*'
-        updated_content = re.sub(pattern, '', content, flags=re.DOTALL)
-        
-        # If the first pattern didn't work, try a more flexible approach
-        if f'posts/{deleted_slug}.html' in updated_content:
-            # Split by articles and filter out the one containing our slug
-            articles = re.split(r'(<article class="post-item">.*?</article>)', content, flags=re.DOTALL)
-            filtered_articles = []
-            for part in articles:
-                if f'posts/{deleted_slug}.html' not in part:
-                    filtered_articles.append(part)
-            updated_content = ''.join(filtered_articles)
-        
-        # Clean up any extra whitespace left behind
-        updated_content = re.sub(r'\n\s*\n\s*\n', '\n\n', updated_content)
-        
-        # Also clean up any standalone empty lines around the deleted content
-        updated_content = re.sub(r'(\n\s*){3,}', '\n\n', updated_content)
-        
-        with open(index_file, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
-        
-        print(f"✅ Updated {index_file}")
+        listed = load_catalog()['posts']
+        for slug in deleted_slugs:
+            if slug not in listed:
+                print(f"💡 {slug} was not listed in {index_file}")
+        # Applied together with any publish that is updating the index right now
+        queue_index_changes(removals=deleted_slugs)
+        if flush_index_changes() is not None:
+            print(f"✅ Updated {index_file}")
         
     except Exception as e:
         print(f"❌ Error updating {index_file}: {e}")
@@ -187,6 +102,7 @@ def delete_post(post_info):
         # Update index if we deleted a published post
         if status == 'published' or any(f.endswith('.html') for f in deleted_files):
             update_index_after_deletion(slug)
+        forget_posts([slug])
         
         print(f"\n✅ Successfully deleted post: {title_display}")
         print(f"   Files removed: {len(deleted_files)}")
@@ -198,7 +114,133 @@ def delete_post(post_info):
     else:
         print(f"\n❌ No files were deleted.")
 
+def find_posts():
+    """Map each slug to its title, date, files and whether it is listed in the catalog"""
+    catalog = load_catalog()
+    found = {}
+    for status, slug, filepath, title in list_post_titles():
+        post = found.setdefault(slug, {'title': None, 'date': None, 'files': [], 'listed': False})
+        post['files'].append(filepath)
+        post['title'] = post['title'] or title
+        if status == 'draft' and post['date'] is None:
+            post['date'] = extract_date_from_markdown(filepath)
+    # Catalog entries whose files are already gone can still be pruned from the index
+    for slug, entry in catalog['posts'].items():
+        post = found.setdefault(slug, {'title': entry['title'], 'date': None, 'files': [], 'listed': False})
+        post['listed'] = True
+        post['date'] = entry['date']
+        post['title'] = post['title'] or entry['title']
+    return found
+
+def select_posts(found, slugs, patterns, before):
+    """Return the matching slugs (sorted) and the explicit slugs that do not exist"""
+    missing = [slug for slug in slugs if slug not in found]
+    if slugs or patterns:
+        selected = {slug for slug in slugs if slug in found}
+        for pattern in patterns:
+            selected.update(fnmatch.filter(found, pattern))
+    else:
+        selected = set(found)
+    if before:
+        selected = {slug for slug in selected if found[slug]['date'] and found[slug]['date'] < before}
+    return sorted(selected), missing
+
+def _count(count, noun):
+    """'1 post', '3 posts'"""
+    return f"{count} {noun}" if count == 1 else f"{count} {noun}s"
+
+def delete_posts(found, slugs, assume_yes=False):
+    """Delete many posts after one confirmation, then update the index once"""
+    files = [filepath for slug in slugs for filepath in found[slug]['files']]
+    listed = [slug for slug in slugs if found[slug]['listed']]
+    
+    print(f"\n🗑️  Delete {_count(len(slugs), 'post')} ({_count(len(files), 'file')}, "
+          f"{len(listed)} listed in index.html)")
+    shown = slugs if len(slugs) <= 20 else slugs[:15]
+    for slug in shown:
+        post = found[slug]
+        print(f"   {post['date'] or '----------'}  {slug}  {post['title'] or ''}")
+    if len(shown) < len(slugs):
+        print(f"   … and {len(slugs) - len(shown)} more")
+    
+    if not assume_yes:
+        if not sys.stdin.isatty():
+            print("❌ No terminal to confirm in: pass --yes to delete non-interactively")
+            sys.exit(1)
+        confirm = input(f"\n⚠️  Are you sure you want to delete {'these' if len(slugs) > 1 else 'this'} "
+                        f"{_count(len(slugs), 'post')}? Type 'DELETE' to confirm: ").strip()
+        if confirm != 'DELETE':
+            print("❌ Deletion cancelled.")
+            return
+    
+    deleted_files = 0
+    for filepath in files:
+        try:
+            os.remove(filepath)
+            deleted_files += 1
+        except Exception as e:
+            print(f"❌ Error deleting {filepath}: {e}")
+    
+    if listed:
+        update_index_after_deletions(listed)
+    forget_posts(slugs)
+    
+    print(f"\n✅ Deleted {_count(len(slugs), 'post')} ({_count(deleted_files, 'file')} removed)")
+    if listed:
+        print(f"\n💡 Don't forget to:")
+        print(f"   • Commit the changes to git")
+        print(f"   • Push to GitHub to update the live blog")
+
+def bulk_main(args):
+    """Handle several slugs, --glob, --before and --yes"""
+    slugs = []
+    patterns = []
+    before = None
+    assume_yes = False
+    while args:
+        arg = args.pop(0)
+        if arg == '--yes':
+            assume_yes = True
+        elif arg in ('--glob', '--before'):
+            if not args:
+                print(f"❌ {arg} expects a value")
+                sys.exit(1)
+            value = args.pop(0)
+            if arg == '--glob':
+                patterns.append(value)
+            else:
+                try:
+                    before = datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+                except ValueError:
+                    print(f"❌ --before expects a date like 2024-01-01, got '{value}'")
+                    sys.exit(1)
+        elif arg.startswith('--'):
+            print(f"❌ Unknown option: {arg}")
+            sys.exit(1)
+        else:
+            slugs.append(arg)
+    
+    if not slugs and not patterns and not before:
+        print("❌ Give slugs, --glob PATTERN or --before DATE to choose the posts to delete")
+        sys.exit(1)
+    
+    found = find_posts()
+    selected, missing = select_posts(found, slugs, patterns, before)
+    if missing:
+        for slug in missing:
+            print(f"❌ Post with slug '{slug}' not found.")
+        sys.exit(1)
+    if not selected:
+        print("No matching posts found.")
+        return
+    delete_posts(found, selected, assume_yes)
+
 def main():
+    args = sys.argv[1:]
+    if len(args) > 1 or any(arg.startswith('--') for arg in args):
+        bulk_main(args)
+        return
+    
     if len(sys.argv) > 1:
         # If slug provided as argument, try to find and delete that post
         target_slug = sys.argv[1]
@@ -214,7 +256,15 @@ def main():
         list_posts()
         return
     
-    # Interactive mode
+    # Interactive mode: search as you type in a terminal, otherwise a numbered list
+    if can_pick():
+        post = pick_post("🗑️  Delete Blog Post")
+        if post is None:
+            print("No selection made.")
+        else:
+            delete_post(post)
+        return
+    
     print("🗑️  Delete Blog Post")
     print("=" * 40)
     
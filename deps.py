@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Build dependency graph for BIO2025 Blog
+
+Every published post records in .build/manifest.json the inputs its HTML was
+built from, each with a fingerprint of exactly what the page uses:
+
+  drafts/<slug>.md            content hash (compared by build_manifest.check_draft)
+  posts/post-template.html    template digest
+  media/images/...            image dimensions and index entry (the srcset derivatives)
+
+References that do not shape the HTML (links to other posts, videos, the
+stylesheet the template links to) are recorded with no fingerprint. So a
+template edit re-renders every post, a new or edited image only the posts
+that show it, and a stylesheet edit none: assets.py rewrites just the dist/
+pages whose referenced assets got a new hash.
+
+Usage: python3 deps.py why-rebuild <path>    # Explain what <path> is built from, or what is built from it
+"""
+
+import os
+import re
+import sys
+import json
+
+from build_manifest import MANIFEST_PATH, hash_bytes, hash_file
+from images import load_image_index, image_dimensions
+from templates import POST_TEMPLATE, load_template
+
+DIST_STATE_PATH = os.path.join('.build', 'dist-state.json')
+DIST_DIR = 'dist'
+
+_REFERENCE = re.compile(r'\b(?:src|href|poster)="([^"]+)"')
+_EXTERNAL = re.compile(r'^(?:[a-z][a-z0-9+.-]*:|//|#)', re.IGNORECASE)
+
+def add_references(refs, html, page_dir='posts'):
+    """Add the local files html links to (as site-relative paths) to the refs set"""
+    for url in _REFERENCE.findall(html):
+        if _EXTERNAL.match(url):
+            continue
+        path = re.split(r'[?#]', url, 1)[0]
+        if path.startswith('/'):
+            path = path.lstrip('/')
+        else:
+            path = os.path.normpath(os.path.join(page_dir, path))
+        refs.add(path.replace(os.sep, '/'))
+    return refs
+
+def fingerprint(path):
+    """What the rendered HTML depends on in path, or None if it only links to it"""
+    if path == POST_TEMPLATE:
+        try:
+            return load_template(path).digest
+        except OSError:
+            return None
+    entry = load_image_index().get(path)
+    dimensions = image_dimensions(path)
+    if entry is None and dimensions is None:
+        return None
+    return hash_bytes(json.dumps([entry, dimensions], sort_keys=True))[:16]
+
+def post_inputs(refs):
+    """The inputs to record for a post rendered with the given content references"""
+    refs = set(refs)
+    try:
+        # The template's own links (stylesheet, index) are references of every post
+        add_references(refs, ''.join(load_template(POST_TEMPLATE).fragments))
+    except OSError:
+        pass
+    inputs = {ref: fingerprint(ref) for ref in refs}
+    inputs[POST_TEMPLATE] = fingerprint(POST_TEMPLATE)
+    return inputs
+
+def stale_inputs(inputs, current):
+    """Return the recorded inputs whose fingerprint has changed
+    
+    current memoizes fingerprints across the posts checked in one build.
+    """
+    stale = []
+    for path, recorded in inputs.items():
+        if path not in current:
+            current[path] = fingerprint(path)
+        if current[path] != recorded:
+            stale.append(path)
+    return stale
+
+def _load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def _stat_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _draft_status(entry):
+    """None if the draft is unchanged, otherwise why it is not"""
+    signature = _stat_signature(entry['draft'])
+    if signature is None:
+        return "draft deleted"
+    if signature == entry.get('draft_stat') or hash_file(entry['draft']) == entry.get('draft_hash'):
+        return None
+    return "content changed"
+
+def _output_status(entry):
+    signature = _stat_signature(entry['output'])
+    if signature == entry.get('html_stat'):
+        return None
+    return "missing" if signature is None else "edited outside the build"
+
+def _asset_status(path, recorded):
+    """Compare an asset with its dist-state record, returning None when unchanged"""
+    signature = _stat_signature(path)
+    if signature is None:
+        return "deleted"
+    if recorded is None:
+        return "new since the last dist build"
+    if signature == recorded[0] or hash_file(path) == recorded[1]:
+        return None
+    return "content changed"
+
+def _print_row(path, status, note="unchanged"):
+    if status:
+        print(f"   🔄 {path:<40} {status}")
+    else:
+        print(f"   ✅ {path:<40} {note}")
+
+def explain_post(manifest, slug, renderer):
+    """Print each input of one post; return (path, reason) for every one that forces a rebuild"""
+    entry = manifest['posts'].get(slug)
+    output = f"posts/{slug}.html"
+    print(f"🔍 {output}")
+    if manifest.get('renderer') != renderer:
+        print(f"   🔄 every post: built with engine {manifest.get('renderer')!r}, now {renderer!r}")
+        return [('markdown engine', 'changed')]
+    if entry is None:
+        print(f"   🔄 not in {MANIFEST_PATH}: never published, or published before the manifest existed")
+        return [(f"drafts/{slug}.md", 'not built yet')]
+    
+    reasons = []
+    status = _output_status(entry)
+    _print_row(output, status, "as last written")
+    if status:
+        reasons.append((output, status))
+    status = _draft_status(entry)
+    _print_row(entry['draft'], status)
+    if status:
+        reasons.append((entry['draft'], status))
+    
+    inputs = entry.get('inputs')
+    if inputs is None:
+        print("   🔄 no inputs recorded (built before dependency tracking)")
+        return reasons + [(output, 'has no recorded inputs')]
+    for path in sorted(inputs):
+        recorded = inputs[path]
+        current = fingerprint(path)
+        if recorded is None and current is None:
+            print(f"   ·  {path:<40} linked only")
+        elif recorded != current:
+            _print_row(path, "changed since the last build")
+            reasons.append((path, "changed"))
+        else:
+            _print_row(path, None)
+    return reasons
+
+def explain_dist_page(state, page):
+    """Print the inputs of dist/<page>; return (path, reason) for every one that forces a rewrite"""
+    print(f"🔍 {DIST_DIR}/{page}")
+    record = state['pages'].get(page)
+    if record is None:
+        print(f"   🔄 not built yet ({DIST_STATE_PATH} has no record)")
+        return [(page, 'not copied to dist/ yet')]
+    reasons = []
+    status = None if _stat_signature(page) == record['stat'] else "changed"
+    _print_row(page, status)
+    if status:
+        reasons.append((page, status))
+    for asset in record['refs']:
+        status = _asset_status(asset, state['assets'].get(asset))
+        _print_row(asset, status)
+        if status:
+            reasons.append((asset, status))
+    return reasons
+
+def dependents(manifest, state, path):
+    """Outputs built from path: post pages from the manifest, dist/ pages from the dist state"""
+    posts = sorted(
+        (slug, entry) for slug, entry in manifest['posts'].items()
+        if entry['draft'] == path or path in entry.get('inputs', {})
+    )
+    pages = sorted(page for page, record in state['pages'].items() if page == path or path in record['refs'])
+    return posts, pages
+
+def explain_input(manifest, state, path):
+    """Print everything built from path and return the outputs it would rebuild
+    
+    Returns None if nothing recorded depends on path.
+    """
+    posts, pages = dependents(manifest, state, path)
+    if not posts and not pages:
+        print(f"ℹ️  Nothing recorded depends on {path}")
+        print(f"💡 Outputs are tracked by publish_post.py ({MANIFEST_PATH}) and assets.py ({DIST_STATE_PATH})")
+        return None
+    print(f"🔍 {path}")
+    rebuilt = []
+    current = fingerprint(path)
+    for slug, entry in posts:
+        output = entry['output']
+        if entry['draft'] == path:
+            status = _draft_status(entry)
+        else:
+            recorded = entry['inputs'][path]
+            if recorded is None and current is None:
+                print(f"   ·  {output:<40} links to it (not rebuilt when it changes)")
+                continue
+            status = "changed since the last build" if recorded != current else None
+        _print_row(output, status, "up to date")
+        if status:
+            rebuilt.append(output)
+    status = _asset_status(path, state['assets'].get(path)) if path in state['assets'] else None
+    for page in pages:
+        if page in rebuilt:
+            page_status = f"after {page} is rebuilt"
+        elif page == path:
+            page_status = None if _stat_signature(page) == state['pages'][page]['stat'] else "changed"
+        else:
+            page_status = status
+        _print_row(f"{DIST_DIR}/{page}", page_status, "up to date")
+        if page_status:
+            rebuilt.append(f"{DIST_DIR}/{page}")
+    return rebuilt
+
+def why_rebuild(path, renderer):
+    """Explain why path would (or would not) be rebuilt by the next publish or dist build
+    
+    Returns True if it would be.
+    """
+    path = os.path.normpath(path).replace(os.sep, '/')
+    manifest = _load_json(MANIFEST_PATH, {})
+    manifest.setdefault('posts', {})
+    state = _load_json(DIST_STATE_PATH, {})
+    state.setdefault('assets', {})
+    state.setdefault('pages', {})
+    
+    page = path[len(DIST_DIR) + 1:] if path.startswith(DIST_DIR + '/') else None
+    source = page or path
+    match = re.fullmatch(r'drafts/(.+)\.md|posts/(.+)\.html', source)
+    slug = match and (match.group(1) or match.group(2))
+    if not slug or source == POST_TEMPLATE.replace(os.sep, '/'):
+        if page is None:
+            rebuilt = explain_input(manifest, state, path)
+            if rebuilt:
+                print(f"🔄 {path} changed, so {len(rebuilt)} output(s) would be rebuilt")
+                for output in rebuilt:
+                    if output.startswith(DIST_DIR + '/') and output[len(DIST_DIR) + 1:] in rebuilt:
+                        print(f"   {path} → {output[len(DIST_DIR) + 1:]} → {output}")
+                    elif f"{DIST_DIR}/{output}" not in rebuilt:
+                        print(f"   {path} → {output}")
+            elif rebuilt is not None:
+                print(f"✅ Nothing built from {path} needs rebuilding")
+            return bool(rebuilt)
+        slug = None
+    
+    # Outputs are listed upstream first: the post page, then its dist/ copy
+    chain = []
+    reasons = []
+    if slug:
+        post_reasons = explain_post(manifest, slug, renderer)
+        if post_reasons:
+            chain = [post_reasons[0][0], f"posts/{slug}.html"]
+        reasons.extend(post_reasons)
+    if page is not None:
+        dist_reasons = explain_dist_page(state, page)
+        if dist_reasons and not chain:
+            chain = [dist_reasons[0][0]]
+        if chain:
+            chain.append(f"{DIST_DIR}/{page}")
+        # A regenerated post page already implies a new dist/ copy
+        reasons.extend(reason for reason in dist_reasons if not chain or reason[0] not in chain[1:])
+    
+    if reasons:
+        print(f"🔄 Would be rebuilt: {'; '.join(f'{where} {why}' for where, why in reasons)}")
+        print(f"   {' → '.join(dict.fromkeys(chain))}")
+    else:
+        print("✅ Up to date: nothing it is built from has changed")
+    return bool(reasons)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != 'why-rebuild':
+        print("Usage: python3 deps.py why-rebuild <path>")
+        print("  <path> is an output (posts/<slug>.html, dist/...) or an input (drafts/<slug>.md,")
+        print("  posts/post-template.html, media/images/..., styles.css)")
+        sys.exit(1)
+    # Imported here: publish_post itself imports this module
+    from publish_post import MARKDOWN_ENGINE
+    why_rebuild(sys.argv[2], MARKDOWN_ENGINE)
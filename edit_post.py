@@ -5,108 +5,10 @@ Script to edit an existing blog post
 
 import os
 import sys
-import re
 from datetime import datetime
 
-def get_existing_posts():
-    """Get list of existing posts"""
-    posts = []
-    posts_dir = "posts"
-    drafts_dir = "drafts"
-    
-    # Check posts directory for HTML files
-    if os.path.exists(posts_dir):
-        for filename in os.listdir(posts_dir):
-            if filename.endswith('.html') and filename != 'post-template.html':
-                filepath = os.path.join(posts_dir, filename)
-                # Only add if file actually exists and is readable
-                if os.path.isfile(filepath) and os.access(filepath, os.R_OK):
-                    slug = filename[:-5]  # Remove .html extension
-                    posts.append(('published', slug, filepath))
-    
-    # Check drafts directory for markdown files
-    if os.path.exists(drafts_dir):
-        for filename in os.listdir(drafts_dir):
-            if filename.endswith('.md') and filename != 'README.md':
-                filepath = os.path.join(drafts_dir, filename)
-                # Only add if file actually exists and is readable
-                if os.path.isfile(filepath) and os.access(filepath, os.R_OK):
-                    slug = filename[:-3]  # Remove .md extension
-                    posts.append(('draft', slug, filepath))
-    
-    return posts
-
-def extract_title_from_html(filepath):
-    """Extract title from HTML file"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Look for <h1> tag in the article
-            match = re.search(r'<article[^>]*>.*?<h1[^>]*>(.*?)</h1>', content, re.DOTALL)
-            if match:
-                return match.group(1).strip()
-    except Exception:
-        pass
-    return None
-
-def extract_title_from_markdown(filepath):
-    """Extract title from markdown file"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Look for title in frontmatter
-            frontmatter_match = re.search(r'^---\s*\n(.*?)\n---', content, re.DOTALL)
-            if frontmatter_match:
-                frontmatter = frontmatter_match.group(1)
-                title_match = re.search(r'^title:\s*(.+)$', frontmatter, re.MULTILINE)
-                if title_match:
-                    return title_match.group(1).strip()
-            
-            # Look for first # header
-            header_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-            if header_match:
-                return header_match.group(1).strip()
-    except Exception:
-        pass
-    return None
-
-def list_posts():
-    """List all existing posts"""
-    posts = get_existing_posts()
-    
-    if not posts:
-        print("No existing posts found.")
-        return None
-    
-    print("\nExisting posts:")
-    print("-" * 50)
-    
-    valid_posts = []
-    for i, (status, slug, filepath) in enumerate(posts, 1):
-        # Double-check that file still exists
-        if not os.path.exists(filepath):
-            continue
-            
-        if status == 'published':
-            title = extract_title_from_html(filepath)
-        else:
-            title = extract_title_from_markdown(filepath)
-        
-        title_display = title if title else slug
-        status_display = "📝 DRAFT" if status == 'draft' else "✅ PUBLISHED"
-        
-        print(f"{len(valid_posts)+1:2d}. {status_display} - {title_display}")
-        print(f"    Slug: {slug}")
-        print(f"    File: {filepath}")
-        print()
-        
-        valid_posts.append((status, slug, filepath))
-    
-    if not valid_posts:
-        print("No valid posts found.")
-        return None
-    
-    return valid_posts
+from post_listing import get_existing_posts, list_posts
+from post_picker import can_pick, pick_post
 
 def open_post_for_editing(post_info):
     """Open a post for editing"""
@@ -154,7 +56,15 @@ def main():
         list_posts()
         return
     
-    # Interactive mode
+    # Interactive mode: search as you type in a terminal, otherwise a numbered list
+    if can_pick():
+        post = pick_post("🖋️  Edit Existing Blog Post")
+        if post is None:
+            print("No selection made.")
+        else:
+            open_post_for_editing(post)
+        return
+    
     print("🖋️  Edit Existing Blog Post")
     print("=" * 40)
     
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Local publish service for editor.html
+
+serve.py answers these JSON calls under /api/, so the editor opened from
+http://localhost:8000/editor.html saves and publishes straight into drafts/
+and posts/ instead of downloading files. Everything runs in the server
+process, so the block cache, compiled templates, image index and post list
+stay warm between calls and a preview renders in a few milliseconds.
+
+  GET  /api/posts                 published posts and drafts (slug, title, status, date)
+  GET  /api/draft?slug=<slug>     a draft's markdown
+  POST /api/preview               {title, excerpt, markdown} -> the rendered post page
+  POST /api/save                  {title, excerpt, markdown[, slug]} -> drafts/<slug>.md only
+  POST /api/publish               save, then publish_post.py <slug>
+
+Only same-origin JSON requests to localhost are accepted.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+
+from new_post import slugify
+from publish_post import parse_frontmatter, markdown_to_html, publish_many
+from images import add_responsive_images
+from templates import POST_TEMPLATE, load_template
+from catalog import load_catalog
+from site_io import write_if_changed
+import post_listing
+
+API_PREFIX = '/api/'
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '[::1]'}
+
+# Publishing, previews and serve.py --watch rebuilds share the caches and
+# the build files, so they take turns
+BUILD_LOCK = threading.Lock()
+
+_SLUG = re.compile(r'[a-z0-9][a-z0-9-]*')
+
+class ApiError(Exception):
+    """A request the service refuses, with the HTTP status to answer"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _single_line(value):
+    """Frontmatter values must fit on one line"""
+    return ' '.join(str(value or '').split())
+
+def _check_slug(slug):
+    if not isinstance(slug, str) or not _SLUG.fullmatch(slug):
+        raise ApiError(400, f"Invalid slug: {slug!r}")
+    return slug
+
+def _draft_path(slug):
+    return os.path.join(post_listing.DRAFTS_DIR, f"{_check_slug(slug)}.md")
+
+def compose_draft(post):
+    """Build the draft file for an editor post, in the layout new_post.py creates
+    
+    Returns (slug, markdown file). An existing draft keeps its date.
+    """
+    title = _single_line(post.get('title'))
+    if not title:
+        raise ApiError(400, "Please enter a title first")
+    slug = _check_slug(post.get('slug') or slugify(title))
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    existing = post_listing.extract_date_from_markdown(_draft_path(slug))
+    if existing:
+        date_str = existing
+    body = str(post.get('markdown') or '').strip()
+    # A loaded draft comes back with its title heading still in the body
+    heading, _, rest = body.partition('\n')
+    if heading.strip() == f"# {title}":
+        body = rest.strip()
+    draft = f'''---
+title: {title}
+date: {date_str}
+excerpt: {_single_line(post.get('excerpt'))}
+---
+
+# {title}
+
+{body}'''
+    return slug, draft
+
+def list_posts(query=None):
+    """Every published post and draft; titles come from the in-memory listing cache"""
+    catalog = load_catalog()
+    posts = []
+    for status, slug, filepath, title in post_listing.list_post_titles():
+        entry = catalog['posts'].get(slug, {})
+        posts.append({
+            'slug': slug,
+            'title': title or slug,
+            'status': status,
+            'path': filepath.replace(os.sep, '/'),
+            'date': entry.get('date'),
+        })
+    return {'posts': posts}
+
+def load_draft(query):
+    """The markdown of one draft"""
+    slug = (query.get('slug') or [''])[0]
+    filepath = _draft_path(slug)
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except OSError:
+        raise ApiError(404, f"Draft not found: {filepath}")
+    return {'slug': slug, 'path': filepath.replace(os.sep, '/'), 'content': content}
+
+def preview(post):
+    """Render an unsaved post exactly as publishing would, without writing anything"""
+    slug, draft = compose_draft(post)
+    frontmatter, markdown_content = parse_frontmatter(draft)
+    html_content = add_responsive_images(markdown_to_html(markdown_content))
+    formatted_date = datetime.strptime(frontmatter['date'], "%Y-%m-%d").strftime("%B %d, %Y")
+    page = load_template(POST_TEMPLATE).render(
+        title=frontmatter['title'], date=formatted_date, content=html_content)
+    # The page's relative links (../styles.css, ../media/...) resolve from posts/
+    page = page.replace('<head>', '<head>\n    <base href="/posts/">', 1)
+    return {'slug': slug, 'html': page}
+
+def save(post):
+    """Write drafts/<slug>.md and nothing else
+    
+    Saving never publishes: serve.py --watch only re-renders posts that are
+    already in the catalog, so a new draft stays private until Publish.
+    """
+    slug, draft = compose_draft(post)
+    filepath = _draft_path(slug)
+    os.makedirs(post_listing.DRAFTS_DIR, exist_ok=True)
+    written = write_if_changed(filepath, draft)
+    return {
+        'slug': slug,
+        'draft': filepath.replace(os.sep, '/'),
+        'written': written,
+        'published': slug in load_catalog()['posts'],
+    }
+
+def publish(post):
+    """Save the draft and publish it in-process"""
+    if not _single_line(post.get('excerpt')):
+        raise ApiError(400, "Please enter an excerpt first")
+    result = save(post)
+    try:
+        posts = publish_many([result['slug']], jobs=1)
+    except SystemExit:
+        raise ApiError(500, f"Publishing {result['slug']} failed; see the server console")
+    result.update({
+        'output': f"posts/{result['slug']}.html",
+        'rendered': bool(posts),
+        'changed': any(post['written'] for post in posts),
+    })
+    return result
+
+ROUTES = {
+    ('GET', 'posts'): list_posts,
+    ('GET', 'draft'): load_draft,
+    ('POST', 'preview'): preview,
+    ('POST', 'save'): save,
+    ('POST', 'publish'): publish,
+}
+
+def _check_origin(handler):
+    """Refuse requests from other hosts and from pages on other origins"""
+    host = handler.headers.get('Host', '')
+    if host.rsplit(':', 1)[0] not in LOCAL_HOSTS:
+        raise ApiError(403, f"Refusing request for host {host!r}")
+    origin = handler.headers.get('Origin')
+    if origin and urlsplit(origin).netloc != host:
+        raise ApiError(403, f"Refusing cross-origin request from {origin}")
+
+def _read_json(handler):
+    if handler.headers.get('Content-Type', '').split(';')[0].strip() != 'application/json':
+        raise ApiError(415, "Expected an application/json body")
+    length = int(handler.headers.get('Content-Length') or 0)
+    if length > MAX_REQUEST_BYTES:
+        raise ApiError(413, "Request body too large")
+    try:
+        data = json.loads(handler.rfile.read(length) or b'{}')
+    except ValueError:
+        raise ApiError(400, "Request body is not valid JSON")
+    if not isinstance(data, dict):
+        raise ApiError(400, "Expected a JSON object")
+    return data
+
+def handle(handler, method):
+    """Answer one /api/ request on an http.server handler"""
+    url = urlsplit(handler.path)
+    name = url.path[len(API_PREFIX):]
+    start = time.perf_counter()
+    try:
+        _check_origin(handler)
+        action = ROUTES.get((method, name))
+        if action is None:
+            raise ApiError(404, f"Unknown API call: {method} {url.path}")
+        argument = _read_json(handler) if method == 'POST' else parse_qs(url.query)
+        with BUILD_LOCK:
+            result = action(argument)
+        status = 200
+    except ApiError as e:
+        status, result = e.status, {'error': str(e)}
+    except Exception as e:
+        status, result = 500, {'error': f"{type(e).__name__}: {e}"}
+    result['ms'] = round((time.perf_counter() - start) * 1000, 2)
+    
+    body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+    handler.send_response(status)
+    handler.send_header('Content-Type', 'application/json; charset=utf-8')
+    handler.send_header('Content-Length', str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Atom feed for BIO2025 Blog
+
+feed.xml lists the newest posts in catalog.json. It is regenerated whenever
+the catalog changes (publish, delete, python3 catalog.py) but only written
+when its bytes change, and its <updated> is the newest entry's, so polling
+readers get a stable Last-Modified/ETag and a 304 when nothing is new.
+"""
+
+import os
+from xml.sax.saxutils import escape, quoteattr
+
+from site_io import write_if_changed
+
+FEED_PATH = 'feed.xml'
+FEED_TITLE = 'BIO2025 Blog'
+# Entry count; catalog.json's feed_entries or BIO2025_FEED_ENTRIES override it
+DEFAULT_FEED_ENTRIES = 20
+# Tag URIs keep entry ids stable wherever the site is hosted
+TAG_AUTHORITY = 'bio2025-blog,2025'
+
+# (source, value) pairs already warned about, so a bad setting is reported once
+_warned_settings = set()
+
+def feed_entries(catalog):
+    """Return the configured number of feed entries
+    
+    BIO2025_FEED_ENTRIES wins over catalog.json's feed_entries. A value that is
+    not a positive whole number is ignored with a warning (printed once), as
+    this runs while the site lock is held and must not fail.
+    """
+    for source, value in (('BIO2025_FEED_ENTRIES', os.environ.get('BIO2025_FEED_ENTRIES')),
+                          ('feed_entries in catalog.json', catalog.get('feed_entries'))):
+        if value is None or value == '':
+            continue
+        try:
+            count = int(value)
+        except (TypeError, ValueError):
+            count = 0
+        if count >= 1:
+            return count
+        if (source, value) not in _warned_settings:
+            _warned_settings.add((source, value))
+            print(f"⚠️  Warning: {source} must be a positive whole number, got {value!r}; ignoring it.")
+    return DEFAULT_FEED_ENTRIES
+
+def entry_updated(post):
+    """When a post last changed, falling back to its publication date"""
+    return post.get('updated') or f"{post['date']}T00:00:00Z"
+
+def render_feed(catalog, slugs):
+    """Render the Atom document for the given slugs (newest first)"""
+    posts = [(slug, catalog['posts'][slug]) for slug in slugs]
+    updated = max((entry_updated(post) for _, post in posts), default='1970-01-01T00:00:00Z')
+    site_url = catalog.get('site_url')
+    base = f' xml:base={quoteattr(site_url.rstrip("/") + "/")}' if site_url else ''
+
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        f'<feed xmlns="http://www.w3.org/2005/Atom"{base}>',
+        f'  <title>{escape(FEED_TITLE)}</title>',
+        f'  <id>tag:{TAG_AUTHORITY}:feed</id>',
+        f'  <link rel="self" href="{FEED_PATH}"/>',
+        '  <link rel="alternate" type="text/html" href="index.html"/>',
+        f'  <updated>{updated}</updated>',
+        f'  <author><name>{escape(FEED_TITLE)}</name></author>',
+    ]
+    for slug, post in posts:
+        # Titles and excerpts are HTML in the catalog, as on the index pages
+        lines.extend([
+            '  <entry>',
+            f'    <title type="html">{escape(post["title"])}</title>',
+            f'    <link rel="alternate" type="text/html" href={quoteattr(post["output"])}/>',
+            f'    <id>tag:{TAG_AUTHORITY}:{escape(slug)}</id>',
+            f'    <published>{post["date"]}T00:00:00Z</published>',
+            f'    <updated>{entry_updated(post)}</updated>',
+            f'    <summary type="html">{escape(post["excerpt"])}</summary>',
+            '  </entry>',
+        ])
+    lines.append('</feed>')
+    return '\n'.join(lines) + '\n'
+
+def write_feed(catalog, slugs, feed_path=FEED_PATH):
+    """Write feed.xml for the newest entries, returning True if it changed"""
+    return write_if_changed(feed_path, render_feed(catalog, slugs[:feed_entries(catalog)]))
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Responsive image derivatives for BIO2025 Blog
+
+Every image in media/images/ is resized to a few widths as WebP plus a JPEG
+(or PNG, for images with transparency) fallback. Derivatives are named after
+a hash of the original, so an unchanged original is never processed twice.
+media/derived/index.json lists them, and publish_post.py uses it to add
+srcset/sizes to the <img> tags it renders.
+
+Every rendered <img> of a file in media/images/ also gets its width and
+height (read from the PNG/JPEG/GIF/WebP header, no Pillow needed) so the
+page does not shift as images load, decoding="async", and loading="lazy"
+unless it is among the first ABOVE_FOLD_IMAGES of the post. Embedded
+<video> tags get preload="none".
+
+Requires Pillow (pip install Pillow); without it posts keep plain <img> tags.
+Usage: python3 images.py [--jobs N]    # Generate missing derivatives
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from site_io import write_if_changed, temp_path, file_lock
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+IMAGES_DIR = os.path.join('media', 'images')
+DERIVED_DIR = os.path.join('media', 'derived')
+IMAGE_INDEX_PATH = os.path.join(DERIVED_DIR, 'index.json')
+STAT_CACHE_PATH = os.path.join('.build', 'image-stats.json')
+
+# Bump when widths or encoder settings change so every derivative is rebuilt
+DERIVATIVE_VERSION = 2
+WIDTHS = (400, 800, 1200)
+QUALITY = 80
+# Animated GIFs would lose their animation, so they are served as-is
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+# .post-content is at most 650px wide less 2rem of padding on each side
+SIZES = '(max-width: 650px) 100vw, 586px'
+# Images this close to the top of a post load eagerly: they are likely in the first viewport
+ABOVE_FOLD_IMAGES = 1
+
+_IMG_TAG = re.compile(r'<img src="([^"]+)" alt="([^"]*)" />')
+_VIDEO_TAG = re.compile(r'<video\b(?![^>]*\bpreload=)')
+
+_index = None
+_index_stat = None
+# {path: (size, mtime_ns, (width, height) or None)}
+_dimensions = {}
+
+def hash_file(filepath):
+    """Content hash of an original, salted with the derivative settings"""
+    digest = hashlib.sha256()
+    digest.update(f'v{DERIVATIVE_VERSION}:{WIDTHS}:{QUALITY}:'.encode('utf-8'))
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def list_originals():
+    """Return the paths of every source image in media/images/"""
+    if not os.path.isdir(IMAGES_DIR):
+        return []
+    return sorted(
+        entry.path for entry in os.scandir(IMAGES_DIR)
+        if entry.is_file() and entry.name.lower().endswith(SOURCE_EXTENSIONS)
+    )
+
+def _load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def _derivative_name(filepath, digest, width, extension):
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    return f"{stem}-{digest[:12]}-{width}.{extension}"
+
+def make_derivatives(filepath, digest):
+    """Process pool worker: write every missing derivative of one original"""
+    with Image.open(filepath) as image:
+        image.load()
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        # Derivatives carry no EXIF, so apply the orientation to the pixels
+        image = ImageOps.exif_transpose(image)
+        width, height = image.size
+        fallback = 'png' if has_alpha else 'jpeg'
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        derivatives = []
+        written = 0
+        # Never upscale; an original narrower than every width is only re-encoded
+        targets = [w for w in WIDTHS if w < width] or [width]
+        for target in targets:
+            resized = None
+            for extension in ('webp', fallback):
+                name = _derivative_name(filepath, digest, target, 'jpg' if extension == 'jpeg' else extension)
+                path = os.path.join(DERIVED_DIR, name)
+                if not os.path.exists(path):
+                    if resized is None:
+                        target_height = max(1, round(height * target / width))
+                        resized = image.resize((target, target_height), Image.LANCZOS)
+                    # Unique per process: a concurrent publish may be writing the same derivative
+                    tmp_path = temp_path(path)
+                    options = {'quality': QUALITY}
+                    if extension == 'jpeg':
+                        options.update(optimize=True, progressive=True)
+                    elif extension == 'png':
+                        options = {'optimize': True}
+                    resized.save(tmp_path, extension.upper(), **options)
+                    os.replace(tmp_path, path)
+                    written += 1
+                derivatives.append([extension, target, name])
+
+    return {
+        'digest': digest,
+        'width': width,
+        'height': height,
+        'derivatives': derivatives,
+    }, written
+
+def _make_derivatives_task(args):
+    return args[0], make_derivatives(*args)
+
+def build_images(jobs=None, quiet=False):
+    """Generate missing derivatives in parallel and refresh the image index
+
+    Returns True if the index changed. Posts record the index entries of the
+    images they show (deps.py), so only those are re-rendered.
+
+    Runs under the site lock: the cleanup below removes every file in
+    media/derived/ that is not listed, which would include a concurrent
+    publish's half-written derivatives.
+    """
+    if Image is None:
+        if not quiet:
+            print("⚠️  Pillow is not installed; skipping responsive images (pip install Pillow)")
+        return False
+
+    with file_lock():
+        return _build_images(jobs, quiet)
+
+def _build_images(jobs, quiet):
+    index = _load_json(IMAGE_INDEX_PATH, {})
+    stats = _load_json(STAT_CACHE_PATH, {})
+    originals = list_originals()
+
+    # Only originals whose bytes changed since the last build need any work
+    todo = []
+    new_stats = {}
+    new_index = {}
+    for filepath in originals:
+        stat = os.stat(filepath)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        cached = stats.get(filepath)
+        digest = cached[1] if cached and cached[0] == signature else hash_file(filepath)
+        new_stats[filepath] = [signature, digest]
+        entry = index.get(filepath)
+        if entry and entry['digest'] == digest and all(
+                os.path.exists(os.path.join(DERIVED_DIR, name)) for _, _, name in entry['derivatives']):
+            new_index[filepath] = entry
+        else:
+            todo.append((filepath, digest))
+
+    results = []
+    if todo:
+        os.makedirs(DERIVED_DIR, exist_ok=True)
+        jobs = jobs or os.cpu_count() or 1
+        if jobs == 1 or len(todo) == 1:
+            results = [_make_derivatives_task(task) for task in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_make_derivatives_task, todo))
+    written = 0
+    for filepath, (entry, count) in results:
+        new_index[filepath] = entry
+        written += count
+
+    # Remove derivatives whose originals were edited or deleted
+    live = {name for entry in new_index.values() for _, _, name in entry['derivatives']}
+    removed = 0
+    if os.path.isdir(DERIVED_DIR):
+        for entry in os.scandir(DERIVED_DIR):
+            if entry.name != 'index.json' and entry.name not in live:
+                os.remove(entry.path)
+                removed += 1
+
+    write_if_changed(STAT_CACHE_PATH, json.dumps(new_stats, indent=2, sort_keys=True))
+    changed = new_index != index
+    if changed:
+        write_if_changed(IMAGE_INDEX_PATH, json.dumps(new_index, indent=2, sort_keys=True) + '\n')
+    if not quiet or written or removed:
+        print(f"🖼️  Images: {len(originals)} originals, {len(todo)} processed, "
+              f"{written} derivatives written, {removed} removed")
+    return changed
+
+def load_image_index():
+    """Return the committed image index, reloading it only when the file changes"""
+    global _index, _index_stat
+    try:
+        stat = os.stat(IMAGE_INDEX_PATH)
+    except OSError:
+        return {}
+    signature = (stat.st_size, stat.st_mtime_ns)
+    if signature != _index_stat:
+        _index = _load_json(IMAGE_INDEX_PATH, {})
+        _index_stat = signature
+    return _index
+
+def _jpeg_dimensions(f):
+    """Walk the JPEG markers to the frame header, noting the EXIF orientation on the way"""
+    swap = False
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        while marker[:1] == b'\xff' and marker[1:] == b'\xff':
+            marker = marker[1:] + f.read(1)
+        if len(marker) != 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        if code == 0xD8 or 0xD0 <= code <= 0xD7:
+            continue
+        length = f.read(2)
+        if len(length) != 2:
+            return None
+        length = struct.unpack('>H', length)[0]
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            frame = f.read(5)
+            if len(frame) != 5:
+                return None
+            height, width = struct.unpack('>xHH', frame)
+            return (height, width) if swap else (width, height)
+        segment = f.read(length - 2)
+        if code == 0xE1 and segment[:6] == b'Exif\x00\x00':
+            # Orientations 5-8 are rotated a quarter turn, and browsers honour them
+            swap = _exif_orientation(segment[6:]) in (5, 6, 7, 8)
+
+def _exif_orientation(tiff):
+    """The Orientation tag of an EXIF TIFF block, or None"""
+    if len(tiff) < 8 or tiff[:2] not in (b'II', b'MM'):
+        return None
+    order = '<' if tiff[:2] == b'II' else '>'
+    offset = struct.unpack(order + 'I', tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return None
+    count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+    for i in range(count):
+        entry = offset + 2 + i * 12
+        if entry + 12 > len(tiff):
+            return None
+        tag, _, _, value = struct.unpack(order + 'HHIH', tiff[entry:entry + 10])
+        if tag == 0x0112:
+            return value
+    return None
+
+def read_dimensions(filepath):
+    """Return (width, height) from an image file's header, or None if unrecognised"""
+    try:
+        with open(filepath, 'rb') as f:
+            head = f.read(30)
+            if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', head[6:10])
+            if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+                chunk = head[12:16]
+                if chunk == b'VP8 ':
+                    width, height = struct.unpack('<HH', head[26:30])
+                    return width & 0x3FFF, height & 0x3FFF
+                if chunk == b'VP8L':
+                    bits = struct.unpack('<I', head[21:25])[0]
+                    return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+                if chunk == b'VP8X':
+                    return (int.from_bytes(head[24:27], 'little') + 1,
+                            int.from_bytes(head[27:30], 'little') + 1)
+                return None
+            if head[:2] == b'\xff\xd8':
+                return _jpeg_dimensions(f)
+    except (OSError, struct.error):
+        pass
+    return None
+
+def image_dimensions(path):
+    """(width, height) of an image under media/images/, cached by path and mtime"""
+    if not path.startswith(IMAGES_DIR + os.sep):
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    cached = _dimensions.get(path)
+    if cached is None or cached[0] != stat.st_size or cached[1] != stat.st_mtime_ns:
+        cached = (stat.st_size, stat.st_mtime_ns, read_dimensions(path))
+        _dimensions[path] = cached
+    return cached[2]
+
+def _srcset(entry, extension, base):
+    return ', '.join(
+        f"{base}{name} {width}w" for ext, width, name in entry['derivatives'] if ext == extension
+    )
+
+def count_images(html):
+    """Number of rendered <img> tags add_responsive_images would finish"""
+    return len(_IMG_TAG.findall(html)) if '<img ' in html else 0
+
+def add_responsive_images(html, page_dir='posts', images_before=0):
+    """Finish the rendered <img> and <video> tags of a post
+
+    Local images with derivatives get a srcset/sizes and a WebP <source>;
+    every image gets its dimensions and lazy/async loading hints; videos get
+    preload="none". images_before counts the images earlier in the same post
+    (when it is rendered piece by piece) so only the first ones load eagerly.
+    """
+    if '<video' in html:
+        html = _VIDEO_TAG.sub('<video preload="none"', html)
+    if '<img ' not in html:
+        return html
+    index = load_image_index()
+    base = os.path.relpath(DERIVED_DIR, page_dir).replace(os.sep, '/') + '/'
+    position = images_before
+
+    def replace(match):
+        nonlocal position
+        src, alt = match.groups()
+        hints = ' decoding="async"' if position < ABOVE_FOLD_IMAGES else ' loading="lazy" decoding="async"'
+        position += 1
+        if '://' in src:
+            return f'<img src="{src}" alt="{alt}"{hints} />'
+        path = os.path.normpath(os.path.join(page_dir, src))
+        dimensions = image_dimensions(path)
+        if dimensions:
+            hints = f' width="{dimensions[0]}" height="{dimensions[1]}"' + hints
+        entry = index.get(path)
+        if entry is None:
+            return f'<img src="{src}" alt="{alt}"{hints} />'
+        fallback = next(ext for ext, _, _ in entry['derivatives'] if ext != 'webp')
+        return (f'<picture><source type="image/webp" srcset="{_srcset(entry, "webp", base)}" sizes="{SIZES}" />'
+                f'<img src="{src}" srcset="{_srcset(entry, fallback, base)}, {src} {entry["width"]}w" '
+                f'sizes="{SIZES}" alt="{alt}"{hints} /></picture>')
+
+    return _IMG_TAG.sub(replace, html)
+
+if __name__ == "__main__":
+    jobs = None
+    if len(sys.argv) == 3 and sys.argv[1] == '--jobs':
+        jobs = int(sys.argv[2])
+    elif len(sys.argv) != 1:
+        print("Usage: python3 images.py [--jobs N]")
+        sys.exit(1)
+    if Image is None:
+        print("❌ Pillow is required: pip install Pillow")
+        sys.exit(1)
+    build_images(jobs)
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+Single-pass Markdown engine for BIO2025 Blog
+A line-oriented block tokenizer plus one inline scanner per paragraph, producing
+the same HTML as the original regex pipeline without re-scanning the whole post.
+
+Usage: python3 markdown_engine.py --compare    # A/B both engines on every draft
+"""
+
+import hashlib
+import json
+import os
+import re
+
+# One alternation handles every inline construct, so each character is scanned once.
+# Code spans and link targets are opaque: emphasis can no longer leak into them.
+# The lookahead plus backreference makes the em body atomic (no backtracking into a
+# code span or link) without (?>...), which needs Python 3.11. Its first alternative
+# takes a run of plain characters at once; it ends where [^*] would have, only sooner.
+# em_simple is the common case of that, a plain run closed by a lone '*', matched
+# without the lookahead; anything else falls through to em.
+_INLINE = re.compile(r'''
+    `(?P<code>[^`]+)`
+  | !\[(?P<alt>[^\]]*)\]\((?P<src>[^)]+)\)
+  | \[(?P<text>(?:!\[[^\]]*\]\([^)]+\)|[^\]])+)\]\((?P<href>[^)]+)\)
+  | \*\*(?P<strong>[^*]+)\*\*
+  | \*(?P<em_simple>[^*`!\[]+)\*(?!\*)
+  | \*(?P<em>(?=(?P<em_body>(?:[^*`!\[]+|\*\*[^*]+\*\*|`[^`]+`|!?\[[^\]]*\]\([^)]+\)|[^*])+))(?P=em_body))\*
+''', re.VERBOSE)
+
+_FENCE_OPEN = re.compile(r'```\w*')
+_OL_ITEM = re.compile(r'\d+\. (.+)')
+_FIGURE_IMAGE = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)\s*$')
+_NON_SPACE = re.compile(r'\S')
+# Literal-prefixed patterns let the regex engine skip ahead with a fast scan
+_LINE_START = re.compile(r'\n[#>`\d-]')
+_LINE_END_PAREN = re.compile(r'\)\s*$', re.MULTILINE)
+_BLOCK_TAG = re.compile(r'<(h[1-6]|ul|ol|li|blockquote|pre|figure|img)')
+_WRAPPED_BLOCK = re.compile(r'<[^>]+>.*</[^>]+>$', re.DOTALL)
+
+# Whole blocks that are one list or one captioned figure, and nothing else
+_UL_BLOCK = re.compile(r'- [^\n]+(?:\n- [^\n]+)*')
+_OL_BLOCK = re.compile(r'\d+\. [^\n]+(?:\n\d+\. [^\n]+)*')
+_OL_MARKER = re.compile(r'^\d+\. ', re.MULTILINE)
+_FIGURE_BLOCK = re.compile(r'!\[([^\]\n]*)\]\(([^)\n]+)\)\n\*([^*\n]+)\*')
+
+# First characters that can start something other than a plain paragraph line
+_BLOCK_CHARS = frozenset('#>-`')
+# ...and those _render_whole_block handles, besides digits
+_WHOLE_BLOCK_CHARS = frozenset('-`!')
+
+def _replace_inline(match):
+    """Emit HTML for one inline token (nested content is scanned recursively)"""
+    # lastindex is the outermost group of the alternative that matched:
+    # 1 code, 3 src (with 2 alt), 5 href (with 4 text), 6 strong, 7 em_simple, 8 em
+    kind = match.lastindex
+    if kind == 1:
+        return f'<code>{match[1]}</code>'
+    if kind == 3:
+        return f'<img src="{match[3]}" alt="{match[2]}" />'
+    if kind == 5:
+        return f'<a href="{match[5]}">{render_inline(match[4])}</a>'
+    if kind == 6:
+        return f'<strong>{render_inline(match[6])}</strong>'
+    if kind == 7:
+        # Nothing in a plain run to render
+        return f'<em>{match[7]}</em>'
+    return f'<em>{render_inline(match[8])}</em>'
+
+def render_inline(text):
+    """Render code spans, images, links, bold and italic in one scan"""
+    if '*' not in text and '`' not in text and '[' not in text:
+        return text
+    return _INLINE.sub(_replace_inline, text)
+
+def _classify(line):
+    """Return (open_tag, content, close_tag, list_kind) for a structured line"""
+    if line.startswith('#'):
+        if line.startswith('### ') and len(line) > 4:
+            return '<h3>', line[4:], '</h3>', None
+        if line.startswith('## ') and len(line) > 3:
+            return '<h2>', line[3:], '</h2>', None
+        if line.startswith('# ') and len(line) > 2:
+            return '<h1>', line[2:], '</h1>', None
+    elif line.startswith('> ') and len(line) > 2:
+        return '<blockquote>', line[2:], '</blockquote>', None
+    elif line.startswith('- ') and len(line) > 2:
+        return '    <li>', line[2:], '</li>', 'ul'
+    elif line[:1].isdecimal():
+        match = _OL_ITEM.match(line)
+        if match:
+            return '    <li>', match.group(1), '</li>', 'ol'
+    return '', line, '', None
+
+def _render_lines(items):
+    """Render a paragraph's line records, keeping inline spans inside code-free runs"""
+    out = []
+    run = []
+
+    def flush():
+        if not run:
+            return
+        rendered = render_inline('\n'.join(content for _, content, _ in run)).split('\n')
+        out.extend(open_tag + content + close_tag
+                   for (open_tag, _, close_tag), content in zip(run, rendered))
+        run.clear()
+
+    for item in items:
+        if isinstance(item, str):
+            flush()
+            out.append(item)
+        else:
+            run.append(item)
+    flush()
+    return '\n'.join(out)
+
+def _render_whole_block(block):
+    """Paragraph HTML for a block that is exactly one list, fence or captioned figure, else None
+
+    These are most of a long post's structured blocks. Each is rendered with a
+    few string operations instead of the line walk, with the same result
+    (already a block element, so _finish_paragraph would only strip it).
+    """
+    first = block[0]
+    if first == '-':
+        # An item ending in an image could start a figure, so those are walked
+        if '![' not in block and _UL_BLOCK.fullmatch(block):
+            items = render_inline(block[2:].replace('\n- ', '\n'))
+            return '<ul>\n    <li>' + items.replace('\n', '</li>\n    <li>') + '</li>\n</ul>'
+    elif first == '`':
+        open_end = block.find('\n')
+        if open_end == -1 or not _FENCE_OPEN.fullmatch(block, 0, open_end):
+            return None
+        start = open_end + 1
+        if block.startswith('```', start):
+            body_end = close = start
+        else:
+            body_end = block.find('\n```', start)
+            if body_end == -1:
+                return None
+            close = body_end + 1
+        # Anything after the closing line is left to the line walk
+        if block.find('\n', close) != -1:
+            return None
+        return f'<pre><code>{block[start:body_end]}</code></pre>{block[close + 3:]}'.rstrip()
+    elif first == '!':
+        match = _FIGURE_BLOCK.fullmatch(block)
+        if match:
+            alt, src, caption = match.groups()
+            return render_inline(f'<figure>\n    <img src="{src}" alt="{alt}" />\n'
+                                 f'    <figcaption>{caption}</figcaption>\n</figure>')
+    elif first.isdecimal():
+        if '![' not in block and _OL_BLOCK.fullmatch(block):
+            items = render_inline(_OL_MARKER.sub('', block))
+            return '<ol>\n    <li>' + items.replace('\n', '</li>\n    <li>') + '</li>\n</ol>'
+    return None
+
+def _finish_paragraph(html):
+    """Wrap a paragraph in <p> unless it is already a block element"""
+    html = html.strip()
+    if not html:
+        return None
+    if html[0] == '<' and (_BLOCK_TAG.match(html) or _WRAPPED_BLOCK.match(html)):
+        return html
+    return f'<p>{html}</p>'
+
+# Bump when rendering changes so persisted block caches are discarded
+BLOCK_CACHE_VERSION = 1
+# Characters of cached Markdown and HTML kept before the least recently used blocks are evicted
+DEFAULT_CACHE_SIZE = 32 * 1024 * 1024
+
+class BlockCache:
+    """LRU cache mapping a block's content to its rendered paragraphs
+
+    In memory a block is looked up by its text: a dict hash plus one string
+    comparison, which costs less than rendering a short block, whereas a
+    blake2b digest of every block cost more. Persisted caches are keyed by
+    that digest instead, so blocks loaded from disk wait in self.stored and
+    a block is only hashed when it is missing from memory.
+
+    Both tables are plain dicts kept in least recently used order (a hit is
+    popped and re-inserted), which is cheaper per block than OrderedDict.
+    Taking the oldest keys of a dict is slow, so once over max_size the
+    cache evicts down to three quarters of it in one go.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = {}
+        self.stored = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(block):
+        """Content hash a block is persisted under"""
+        return hashlib.blake2b(block.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, block):
+        """Return a block's cached paragraphs, or None"""
+        html = self.entries.pop(block, None)
+        if html is not None:
+            self.entries[block] = html
+        elif self.stored:
+            html = self.restore(block)
+            self.trim()
+        if html is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return html
+
+    def put(self, block, html):
+        if block in self.entries:
+            self.size -= len(block) + sum(map(len, self.entries.pop(block)))
+        self.entries[block] = html
+        self.size += len(block) + sum(map(len, html))
+        self.trim()
+
+    def restore(self, block):
+        """Move a block loaded from disk into memory (without trimming), returning its paragraphs or None"""
+        html = self.stored.pop(self.key(block), None)
+        if html is not None:
+            self.entries[block] = html
+            self.size += len(block)
+        return html
+
+    def trim(self):
+        """Evict the least recently used blocks once the cache is over max_size"""
+        if self.size <= self.max_size:
+            return
+        target = self.max_size * 3 // 4
+        # Blocks loaded from disk but not used by this process go first
+        for table, counts_key in ((self.stored, False), (self.entries, True)):
+            evicted = []
+            for key, html in table.items():
+                if self.size <= target:
+                    break
+                self.size -= sum(map(len, html)) + (len(key) if counts_key else 0)
+                evicted.append(key)
+            for key in evicted:
+                del table[key]
+
+    def clear(self):
+        """Drop every entry and reset the hit/miss counters"""
+        self.entries.clear()
+        self.stored.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path):
+        """Merge a persisted cache into memory; a missing or stale file is ignored"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != BLOCK_CACHE_VERSION:
+            return
+        self.merge(data.get('entries', []))
+
+    def merge(self, entries):
+        """Add persisted [key, html] pairs, as read by load() or returned by drain()"""
+        for key, html in entries:
+            html = tuple(html)
+            old = self.stored.pop(key, None)
+            if old is not None:
+                self.size -= sum(map(len, old))
+            self.stored[key] = html
+            self.size += sum(map(len, html))
+        self.trim()
+
+    def drain(self):
+        """Remove the blocks held in memory, returning them as persisted [key, html] pairs
+
+        Process pool workers send these back so that the parent can save them.
+        """
+        entries = []
+        for block, html in self.entries.items():
+            self.size -= len(block) + sum(map(len, html))
+            entries.append([self.key(block), html])
+        self.entries.clear()
+        return entries
+
+    def save(self, path):
+        """Persist the cache by content hash, least recently used entries first"""
+        from site_io import write_if_changed
+        entries = [[key, list(html)] for key, html in self.stored.items()]
+        entries.extend([self.key(block), list(html)] for block, html in self.entries.items())
+        data = {'version': BLOCK_CACHE_VERSION, 'entries': entries}
+        write_if_changed(path, json.dumps(data, separators=(',', ':')))
+
+# Shared by every render in this process (publish batches, watch mode, services)
+BLOCK_CACHE = BlockCache()
+
+class BlockTokenizer:
+    """Split Markdown text into paragraphs of rendered lines.
+
+    Paragraphs are runs of non-empty lines, exactly like the original
+    split('\\n\\n'); fenced code is kept whole even when it contains blank lines.
+    Plain paragraphs are taken in one step; only paragraphs with block markup
+    are walked line by line.
+    """
+
+    def __init__(self, text, cache=None):
+        self.text = text
+        self.cache = cache
+        self.pos = 0
+        self.pending = []
+        # Furthest position a fence or figure lookahead has examined
+        self.horizon = 0
+        # Where rendering stopped when the text is only the start of a document
+        self.resume = len(text)
+
+    def _next_line(self):
+        if self.pending:
+            return self.pending.pop()
+        text = self.text
+        pos = self.pos
+        if pos > len(text):
+            return None
+        end = text.find('\n', pos)
+        if end == -1:
+            end = len(text)
+        self.pos = end + 1
+        return text[pos:end]
+
+    def _read_fence(self):
+        """Consume a fenced code block, or return None if it is never closed"""
+        text = self.text
+        pos = self.pos
+        if text.startswith('```', pos):
+            body_end = close = pos
+        else:
+            body_end = text.find('\n```', pos)
+            if body_end == -1:
+                # A failed search depends on everything after the block, even at the end
+                self.horizon = len(text) + 1
+                return None
+            close = body_end + 1
+        line_end = text.find('\n', close)
+        if line_end == -1:
+            line_end = len(text)
+        self.horizon = max(self.horizon, line_end)
+        self.pos = line_end + 1
+        return f'<pre><code>{text[pos:body_end]}</code></pre>{text[close + 3:line_end]}'
+
+    def _read_figure(self, line, match):
+        """Turn an image followed by a *caption* into figure lines, or return False"""
+        text = self.text
+        found = _NON_SPACE.search(text, self.pos)
+        if found is None:
+            self.horizon = len(text) + 1
+            return False
+        star = found.start()
+        self.horizon = max(self.horizon, star)
+        # The caption must start a line and needs at least one character before its closing '*'
+        if text[star] != '*' or text[star - 1] != '\n' or text.startswith('**', star):
+            return False
+
+        # The caption runs to the next '*', which may be several lines further on
+        close = text.find('*', star + 1)
+        if close == -1:
+            self.horizon = len(text) + 1
+            return False
+        self.horizon = max(self.horizon, close)
+        line_end = text.find('\n', close)
+        if line_end == -1:
+            line_end = len(text)
+        self.pos = line_end + 1
+
+        alt, src = match.groups()
+        caption = text[star + 1:close].split('\n')
+        figure = [
+            line[:match.start()] + '<figure>',
+            f'    <img src="{src}" alt="{alt}" />',
+            '    <figcaption>' + caption[0],
+        ]
+        figure.extend(caption[1:])
+        figure[-1] += '</figcaption>'
+        figure.append('</figure>' + text[close + 1:line_end])
+
+        # Figure lines are tokenized like any other input lines
+        self.pending.extend(reversed(figure))
+        return True
+
+    def _walk_lines(self):
+        """Tokenize line by line from self.pos until a paragraph boundary"""
+        items = []
+        structured = False
+        list_kind = None
+
+        while True:
+            line = self._next_line()
+            if line is None or line == '':
+                if items:
+                    if list_kind:
+                        items.append(f'</{list_kind}>')
+                        list_kind = None
+                    if structured:
+                        html = _render_lines(items)
+                    else:
+                        html = render_inline('\n'.join(content for _, content, _ in items))
+                    html = _finish_paragraph(html)
+                    if html is not None:
+                        yield html
+                    items = []
+                    structured = False
+                    if not self.pending:
+                        return
+                if line is None:
+                    return
+                continue
+
+            first = line[0]
+            tail = line[-1]
+            lookahead = not self.pending
+            if lookahead and (tail == ')' or (tail.isspace() and line.rstrip().endswith(')'))):
+                match = _FIGURE_IMAGE.search(line)
+                if match and self._read_figure(line, match):
+                    continue
+
+            if first in _BLOCK_CHARS or first.isdecimal():
+                if first == '`' and lookahead and _FENCE_OPEN.fullmatch(line):
+                    code = self._read_fence()
+                    if code is not None:
+                        if list_kind:
+                            items.append(f'</{list_kind}>')
+                            list_kind = None
+                        items.append(code)
+                        structured = True
+                        continue
+
+                open_tag, content, close_tag, kind = _classify(line)
+                if kind != list_kind:
+                    if list_kind:
+                        items.append(f'</{list_kind}>')
+                    if kind:
+                        items.append(f'<{kind}>')
+                    list_kind = kind
+                if open_tag:
+                    structured = True
+                items.append((open_tag, content, close_tag))
+                continue
+
+            if list_kind:
+                items.append(f'</{list_kind}>')
+                list_kind = None
+            items.append(('', line, ''))
+
+    def _render_block(self, block, start, end):
+        """Render one split('\\n\\n') block, returning (paragraphs, cacheable)"""
+        simple = block.lstrip('\n')
+        if not simple:
+            return (), True
+
+        first = simple[0]
+        decimal = first.isdecimal()
+        if decimal or first in _WHOLE_BLOCK_CHARS:
+            html = _render_whole_block(simple)
+            if html is not None:
+                return (html,), True
+        structured = decimal or first in _BLOCK_CHARS
+        # The substring tests skip the regex searches for most paragraphs; on a
+        # single line, _LINE_END_PAREN only asks whether it ends in ')'
+        if '\n' in simple:
+            walk = (structured or _LINE_START.search(simple)
+                    or (')' in simple and _LINE_END_PAREN.search(simple)))
+        else:
+            # A lone heading, quote or list item line can skip the line walk
+            walk = first == '`' or (')' in simple and simple.rstrip().endswith(')'))
+
+        if walk:
+            self.pos = start
+            self.horizon = start
+            paragraphs = tuple(self._walk_lines())
+            # Cacheable only if the walk never looked past this block
+            return paragraphs, self.horizon <= end and self.pos <= end + 2
+
+        if structured:
+            open_tag, content, close_tag, kind = _classify(simple)
+            html = open_tag + render_inline(content) + close_tag
+            if kind:
+                return (f'<{kind}>\n{html}\n</{kind}>',), True
+            if open_tag:
+                # Already a block element that starts and ends with a tag
+                return (html,), True
+        else:
+            html = render_inline(simple)
+
+        html = _finish_paragraph(html)
+        return (() if html is None else (html,)), True
+
+    def paragraphs(self, partial=False):
+        """Return the rendered HTML of each paragraph, in order, as a list.
+
+        Paragraphs without block markup are rendered straight from the
+        split('\\n\\n') blocks; everything else is walked line by line.
+        With a cache, each self-contained block is looked up by its content.
+
+        With partial=True the text is only the start of a document: the last
+        block may still grow, so rendering stops before the first block whose
+        HTML could depend on text not read yet, and self.resume is set to
+        where that block starts.
+        """
+        text = self.text
+        cache = self.cache
+        if cache is not None:
+            # The cache's tables are used directly: a method call per block
+            # costs about as much as rendering a short one
+            entries = cache.entries
+            stored = cache.stored
+            added = reused = hits = misses = 0
+        blocks = text.split('\n\n')
+        if partial:
+            limit = len(text) - len(blocks.pop())
+            self.resume = limit
+        out = []
+        offset = 0
+        for block in blocks:
+            start = offset
+            offset += len(block) + 2
+            if start < self.pos:
+                # Part or all of this block was consumed by a fence or figure caption
+                if self.pos >= offset - 2:
+                    continue
+                start = self.pos
+                block = text[start:offset - 2]
+
+            if cache is None:
+                paragraphs, cacheable = self._render_block(block, start, offset - 2)
+            else:
+                paragraphs = entries.pop(block, None)
+                if paragraphs is not None:
+                    entries[block] = paragraphs
+                elif stored:
+                    paragraphs = cache.restore(block)
+                if paragraphs is None:
+                    misses += 1
+                    paragraphs, cacheable = self._render_block(block, start, offset - 2)
+                    if cacheable:
+                        entries[block] = paragraphs
+                        added += len(block)
+                else:
+                    hits += 1
+                    reused += sum(map(len, paragraphs))
+                    cacheable = True
+
+            if not cacheable:
+                if partial and (self.horizon >= limit or self.pos > limit):
+                    # A fence or figure lookahead reached the unfinished tail
+                    self.pos = start
+                    self.resume = start
+                    break
+                if cache is not None:
+                    reused += sum(map(len, paragraphs))
+            out += paragraphs
+
+        if cache is not None:
+            # The HTML just cached is everything rendered except reused or uncacheable
+            # blocks, summed once here rather than per block. Eviction waits until now.
+            cache.size += added + sum(map(len, out)) - reused
+            cache.hits += hits
+            cache.misses += misses
+            cache.trim()
+        return out
+
+def render_markdown(markdown_content, cache=None):
+    """Convert markdown to HTML in a single pass over the input
+
+    Pass a BlockCache (e.g. BLOCK_CACHE) to reuse the HTML of unchanged blocks.
+    """
+    return '\n\n'.join(BlockTokenizer(markdown_content, cache).paragraphs())
+
+def stream_markdown(chunks, cache=None):
+    """Yield the paragraphs of render_markdown(''.join(chunks)), reading chunks lazily
+
+    Only the text that cannot be rendered yet is kept: the unfinished last
+    block, or a fence or figure still looking for its end. Memory therefore
+    follows the largest block rather than the document. A tail that makes no
+    progress is retried only once it has doubled, so the work stays linear.
+    """
+    tail = ''
+    retry_at = 0
+    for chunk in chunks:
+        tail += chunk
+        if len(tail) < retry_at or '\n\n' not in tail:
+            continue
+        tokenizer = BlockTokenizer(tail, cache)
+        yield from tokenizer.paragraphs(partial=True)
+        tail = tail[tokenizer.resume:]
+        retry_at = 2 * len(tail) if tokenizer.resume == 0 else 0
+    if tail:
+        yield from BlockTokenizer(tail, cache).paragraphs()
+
+def compare_engines():
+    """Render every draft with both engines and report differences and timings"""
+    import os
+    import time
+    from publish_post import parse_frontmatter, markdown_to_html_legacy, list_draft_slugs
+
+    slugs = list_draft_slugs()
+    if not slugs:
+        print("No drafts to compare.")
+        return True
+
+    mismatches = 0
+    legacy_seconds = engine_seconds = 0.0
+    for slug in slugs:
+        with open(os.path.join("drafts", f"{slug}.md"), 'r') as f:
+            _, markdown_content = parse_frontmatter(f.read())
+
+        start = time.perf_counter()
+        legacy_html = markdown_to_html_legacy(markdown_content)
+        legacy_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine_html = render_markdown(markdown_content)
+        engine_seconds += time.perf_counter() - start
+
+        if legacy_html != engine_html:
+            mismatches += 1
+            print(f"❌ Output differs: {slug}")
+
+    print(f"\n📊 Compared {len(slugs)} drafts, {mismatches} differ")
+    print(f"   regex engine:     {legacy_seconds * 1000:.2f} ms")
+    print(f"   tokenizer engine: {engine_seconds * 1000:.2f} ms")
+    return mismatches == 0
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] != ['--compare']:
+        print("Usage: python3 markdown_engine.py --compare")
+        sys.exit(1)
+
+    sys.exit(0 if compare_engines() else 1)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+HTML/CSS minification and critical-CSS inlining for the production build
+
+python3 assets.py --minify runs this on everything it writes to dist/:
+  - stylesheets are minified (comments and optional whitespace removed)
+  - pages lose their template indentation and comments; <pre>, <textarea>,
+    <script> and <style> contents are left exactly as they are
+  - each page gets the stylesheet rules its own markup can match inlined in
+    a <style>, and the full stylesheet is loaded without blocking rendering,
+    so a page renders from its first response
+
+Rules are matched against the tag names, classes and ids a page contains,
+ignoring pseudo-classes, so the inlined subset errs on the side of too much.
+"""
+
+import re
+
+# Bump when the output changes so assets.py rewrites every minified page
+MINIFY_VERSION = 1
+# Inline at most this much CSS; larger subsets keep the plain <link>
+CRITICAL_CSS_LIMIT = 14 * 1024
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_STRING = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+_CSS_SPACE = re.compile(r'\s*([{};,>])\s*')
+_CSS_COLON = re.compile(r':\s+')
+
+_PSEUDO = re.compile(r'::?[\w-]+(?:\([^)]*\))?')
+_ATTRIBUTE = re.compile(r'\[[^\]]*\]')
+_SIMPLE_SELECTOR = re.compile(r'([#.]?)(-?[_a-zA-Z][\w-]*)')
+
+_HTML_TAG_NAME = re.compile(r'<([a-zA-Z][\w-]*)')
+_HTML_CLASS = re.compile(r'\bclass="([^"]*)"')
+_HTML_ID = re.compile(r'\bid="([^"]*)"')
+_PRESERVED = re.compile(r'<(pre|textarea|script|style)\b.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+_HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_BLOCK_TAG = re.compile(
+    r'\s*(</?(?:!doctype|html|head|body|meta|link|title|base|header|main|footer|nav|article|section|aside|'
+    r'div|p|h[1-6]|ul|ol|li|dl|dt|dd|figure|figcaption|blockquote|table|thead|tbody|tr|th|td|hr|br|'
+    r'form|source|noscript)\b[^>]*>)\s*', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+_STYLESHEET_LINK = re.compile(r'<link rel="stylesheet" href="([^"]+)"\s*/?>')
+
+def minify_css(css):
+    """Remove comments and every optional space from a stylesheet"""
+    parts = _CSS_STRING.split(_CSS_COMMENT.sub('', css))
+    for i in range(0, len(parts), 2):
+        # Even entries are outside string literals
+        text = _WHITESPACE.sub(' ', parts[i])
+        text = _CSS_SPACE.sub(r'\1', text)
+        parts[i] = _CSS_COLON.sub(':', text)
+    return ''.join(parts).replace(';}', '}').strip()
+
+def parse_css(css):
+    """Split a minified stylesheet into top-level items
+    
+    Each item is ('rule', selectors, text), ('group', prelude, items) for
+    @media/@supports blocks, or ('other', None, text) for any other at-rule.
+    """
+    items = []
+    pos = 0
+    while pos < len(css):
+        brace = css.find('{', pos)
+        semicolon = css.find(';', pos)
+        if brace == -1 or (css.startswith('@', pos) and -1 < semicolon < brace):
+            # A statement at-rule such as @import or @charset
+            end = len(css) if semicolon == -1 else semicolon + 1
+            items.append(('other', None, css[pos:end]))
+            pos = end
+            continue
+        prelude = css[pos:brace]
+        depth = 0
+        end = brace
+        for end in range(brace, len(css)):
+            if css[end] == '{':
+                depth += 1
+            elif css[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+        body = css[brace + 1:end]
+        if prelude.startswith(('@media', '@supports')):
+            items.append(('group', prelude, parse_css(body)))
+        elif prelude.startswith('@'):
+            items.append(('other', None, css[pos:end + 1]))
+        else:
+            items.append(('rule', prelude.split(','), css[pos:end + 1]))
+        pos = end + 1
+    return items
+
+def page_vocabulary(html):
+    """The tag names, classes and ids used in a page"""
+    tags = {name.lower() for name in _HTML_TAG_NAME.findall(html)}
+    classes = {name for value in _HTML_CLASS.findall(html) for name in value.split()}
+    ids = set(_HTML_ID.findall(html))
+    return tags, classes, ids
+
+def selector_matches(selector, vocabulary):
+    """True if every part of selector names something the page contains"""
+    tags, classes, ids = vocabulary
+    selector = _ATTRIBUTE.sub('', _PSEUDO.sub('', selector))
+    for kind, name in _SIMPLE_SELECTOR.findall(selector):
+        if kind == '.':
+            found = name in classes
+        elif kind == '#':
+            found = name in ids
+        else:
+            found = name.lower() in tags
+        if not found:
+            return False
+    return True
+
+def critical_css(items, vocabulary):
+    """The rules (and @media groups) of a parsed stylesheet that can apply to the page"""
+    out = []
+    for kind, prelude, value in items:
+        if kind == 'rule':
+            if any(selector_matches(selector, vocabulary) for selector in prelude):
+                out.append(value)
+        elif kind == 'group':
+            inner = critical_css(value, vocabulary)
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        else:
+            out.append(value)
+    return ''.join(out)
+
+def inline_critical_css(html, stylesheets):
+    """Inline each linked stylesheet's matching rules and load the full sheet asynchronously
+    
+    stylesheets maps a page's href to the parsed rules of that file; links
+    to anything else are left alone.
+    """
+    vocabulary = None
+    
+    def replace(match):
+        nonlocal vocabulary
+        href = match.group(1)
+        items = stylesheets.get(href)
+        if items is None:
+            return match.group(0)
+        if vocabulary is None:
+            vocabulary = page_vocabulary(html)
+        css = critical_css(items, vocabulary)
+        if len(css) > CRITICAL_CSS_LIMIT:
+            return match.group(0)
+        return (f'<style>{css}</style>'
+                f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+                f'<noscript><link rel="stylesheet" href="{href}"></noscript>')
+    
+    return _STYLESHEET_LINK.sub(replace, html)
+
+def _collapse(text):
+    text = _HTML_COMMENT.sub('', text)
+    text = _WHITESPACE.sub(' ', text)
+    return _BLOCK_TAG.sub(r'\1', text)
+
+def minify_html(html):
+    """Collapse the whitespace and drop the comments of a page, outside preformatted elements"""
+    out = []
+    pos = 0
+    strip_left = True
+    for match in _PRESERVED.finditer(html):
+        text = _collapse(html[pos:match.start()])
+        # Whitespace next to a block of code or a script never renders; next to a textarea it may
+        block = match.group(1).lower() != 'textarea'
+        text = text.rstrip() if block else text
+        out.append(text.lstrip() if strip_left else text)
+        out.append(match.group(0))
+        strip_left = block
+        pos = match.end()
+    text = _collapse(html[pos:]).rstrip()
+    out.append(text.lstrip() if strip_left else text)
+    return ''.join(out)
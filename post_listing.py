@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Shared post listing for edit_post.py and delete_post.py
+
+Posts are found with os.scandir and titles come from the head of each file
+only: the frontmatter of drafts and the <article> header of published posts.
+Titles (and draft dates, once asked for) are cached in
+.build/listing-cache.json keyed on (path, mtime, size), so listing an
+unchanged site reads no file contents at all. get_existing_posts needs
+only file names, which are cached against each directory's mtime, so an
+unchanged directory is not even scanned.
+"""
+
+import os
+import re
+import json
+import time
+
+from site_io import write_if_changed
+
+POSTS_DIR = "posts"
+DRAFTS_DIR = "drafts"
+LISTING_CACHE_PATH = os.path.join('.build', 'listing-cache.json')
+LISTING_CACHE_VERSION = 2
+
+# The <article> header sits in the first few hundred bytes of a generated post
+HTML_HEAD_BYTES = 8192
+
+_HTML_TITLE = re.compile(r'<article[^>]*>.*?<h1[^>]*>(.*?)</h1>', re.DOTALL)
+_FRONTMATTER_TITLE = re.compile(r'title:\s*(.+)')
+_HEADER_TITLE = re.compile(r'#\s+(.+)')
+_FRONTMATTER_DATE = re.compile(r'date:\s*(\d{4}-\d{2}-\d{2})')
+
+# A directory's mtime can miss a change made within the same clock tick, so
+# its name list is only cached once the directory has been still this long
+SETTLED_NS = 1_000_000_000
+
+# {directory: {filename: [mtime_ns, size, title(, date)]}}
+_cache = None
+# {directory: [mtime_ns, [filename, ...]]}
+_names = None
+_cache_dirty = False
+
+def extract_title_from_html(filepath):
+    """Extract the <article> <h1> title, reading only the head of the file"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            head = f.read(HTML_HEAD_BYTES)
+            match = _HTML_TITLE.search(head)
+            if match is None and len(head) == HTML_HEAD_BYTES:
+                # Unusually long head: fall back to the rest of the file
+                match = _HTML_TITLE.search(head + f.read())
+            if match:
+                return match.group(1).strip()
+    except Exception:
+        pass
+    return None
+
+def extract_title_from_markdown(filepath):
+    """Extract the frontmatter title, or the first # header, reading line by line"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            first = f.readline()
+            if first.rstrip() == '---':
+                for line in f:
+                    if line.rstrip() == '---':
+                        break
+                    match = _FRONTMATTER_TITLE.match(line)
+                    if match:
+                        return match.group(1).strip()
+            else:
+                match = _HEADER_TITLE.match(first)
+                if match:
+                    return match.group(1).strip()
+    
+            # No frontmatter title: stop at the first # header
+            for line in f:
+                match = _HEADER_TITLE.match(line)
+                if match:
+                    return match.group(1).strip()
+    except Exception:
+        pass
+    return None
+
+def extract_date_from_markdown(filepath):
+    """Extract the frontmatter date (YYYY-MM-DD), reading only the frontmatter"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            if f.readline().rstrip() != '---':
+                return None
+            for line in f:
+                if line.rstrip() == '---':
+                    break
+                match = _FRONTMATTER_DATE.match(line)
+                if match:
+                    return match.group(1)
+    except Exception:
+        pass
+    return None
+
+def _load_cache(path=LISTING_CACHE_PATH):
+    """Load the title and name caches once per process"""
+    global _cache, _names
+    if _cache is None:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != LISTING_CACHE_VERSION:
+                raise ValueError("stale listing cache")
+            _cache = data['titles']
+            _names = data['names']
+        except (OSError, ValueError, KeyError, AttributeError):
+            _cache = {}
+            _names = {}
+    return _cache
+
+def save_cache(path=LISTING_CACHE_PATH):
+    """Persist the caches if anything was read since they were loaded"""
+    global _cache_dirty
+    if _cache is None or not _cache_dirty:
+        return
+    data = {'version': LISTING_CACHE_VERSION, 'titles': _cache, 'names': _names}
+    write_if_changed(path, json.dumps(data, separators=(',', ':'), ensure_ascii=False))
+    _cache_dirty = False
+
+def _scan(directory, extension, skip, status, extract_title):
+    """Return (status, slug, filepath, title) for matching files, sorted by slug
+    
+    Every file is stat'ed through os.scandir, but only files whose
+    (mtime, size) differ from the cache are opened to read their title.
+    """
+    global _cache_dirty
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return []
+    
+    cache = _load_cache()
+    old = cache.get(directory, {})
+    titles = {}
+    posts = []
+    cut = -len(extension)
+    with entries:
+        for entry in entries:
+            name = entry.name
+            if not name.endswith(extension) or name == skip:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            cached = old.get(name)
+            if cached is None or cached[0] != stat.st_mtime_ns or cached[1] != stat.st_size:
+                cached = [stat.st_mtime_ns, stat.st_size, extract_title(entry.path)]
+                _cache_dirty = True
+            titles[name] = cached
+            posts.append((status, name[:cut], entry.path, cached[2]))
+    
+    # Files that disappeared are dropped so the cache does not grow forever
+    if len(titles) != len(old):
+        _cache_dirty = True
+    cache[directory] = titles
+    posts.sort(key=lambda post: post[1])
+    return posts
+
+def list_post_titles():
+    """Return (status, slug, filepath, title) for every published post and draft"""
+    posts = _scan(POSTS_DIR, '.html', 'post-template.html', 'published', extract_title_from_html)
+    posts.extend(_scan(DRAFTS_DIR, '.md', 'README.md', 'draft', extract_title_from_markdown))
+    save_cache()
+    return posts
+
+def list_post_dates():
+    """Return (status, slug, filepath, title, date) for every post; date is a draft's frontmatter date, None for published posts
+    
+    Dates are read once per draft version and cached next to its title.
+    """
+    global _cache_dirty
+    listing = list_post_titles()
+    drafts = _load_cache().get(DRAFTS_DIR, {})
+    posts = []
+    for status, slug, filepath, title in listing:
+        date = None
+        cached = drafts.get(os.path.basename(filepath)) if status == 'draft' else None
+        if cached is not None:
+            if len(cached) < 4:
+                cached.append(extract_date_from_markdown(filepath))
+                _cache_dirty = True
+            date = cached[3]
+        posts.append((status, slug, filepath, title, date))
+    save_cache()
+    return posts
+
+def _list_names(directory, extension, skip, status):
+    """Return (status, slug, filepath) for matching files, sorted by slug
+    
+    Adding, removing or renaming a file updates the directory's mtime, so
+    while that matches the cache the names are reused without a scan. The
+    scan itself needs no per-file stat: scandir already knows the file type.
+    """
+    global _cache_dirty
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return []
+    
+    _load_cache()
+    cut = -len(extension)
+    cached = _names.get(directory)
+    if cached is not None and cached[0] == mtime:
+        names = cached[1]
+    else:
+        names = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.endswith(extension) or name == skip:
+                        continue
+                    try:
+                        if entry.is_file():
+                            names.append(name)
+                    except OSError:
+                        continue
+        except OSError:
+            return []
+        names.sort(key=lambda name: name[:cut])
+        if time.time_ns() - mtime >= SETTLED_NS:
+            _names[directory] = [mtime, names]
+            _cache_dirty = True
+        elif _names.pop(directory, None) is not None:
+            _cache_dirty = True
+    
+    prefix = os.path.join(directory, '')
+    return [(status, name[:cut], prefix + name) for name in names]
+
+def get_existing_posts():
+    """Get list of existing posts as (status, slug, filepath)"""
+    posts = _list_names(POSTS_DIR, '.html', 'post-template.html', 'published')
+    posts.extend(_list_names(DRAFTS_DIR, '.md', 'README.md', 'draft'))
+    save_cache()
+    return posts
+
+def list_posts():
+    """List all existing posts"""
+    listing = list_post_titles()
+    
+    if not listing:
+        print("No existing posts found.")
+        return None
+    
+    lines = ["\nExisting posts:", "-" * 50]
+    for i, (status, slug, filepath, title) in enumerate(listing, 1):
+        title_display = title if title else slug
+        status_display = "📝 DRAFT" if status == 'draft' else "✅ PUBLISHED"
+        lines.append(f"{i:2d}. {status_display} - {title_display}")
+        lines.append(f"    Slug: {slug}")
+        lines.append(f"    File: {filepath}")
+        lines.append("")
+    print('\n'.join(lines))
+    
+    return [(status, slug, filepath) for status, slug, filepath, _ in listing]
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Incremental search picker for edit_post.py and delete_post.py
+
+The slug, title and date of every post are loaded once into an in-memory
+word index. Each query word then matches post words by prefix (a sorted
+vocabulary and bisect) or, from FUZZY_MIN_LENGTH letters on, as a
+subsequence ("pblsh" finds "publish"), so every keystroke costs a few set
+operations rather than a scan of every title. Results are ranked: posts
+where every query word is a whole word first, then where every query word
+is a prefix, then fuzzy matches; newest first within each group.
+
+In a terminal, results update as you type and are shown PAGE_SIZE at a
+time. When stdin is not a TTY (or the terminal cannot be put in raw mode)
+the caller falls back to the numbered list.
+Usage:
+  python3 post_picker.py              # Try the picker on this site
+  python3 post_picker.py bio day      # Print the ranked matches for a query
+"""
+
+import os
+import re
+import sys
+import time
+import select
+from bisect import bisect_left, bisect_right
+
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+from catalog import load_catalog
+from post_listing import list_post_dates
+
+PAGE_SIZE = 10
+# Shorter query words only match by prefix; a fuzzy "ab" matches nearly everything
+FUZZY_MIN_LENGTH = 3
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+# Terminal keys as read in raw mode
+_ENTER = ('\r', '\n')
+_BACKSPACE = ('\x7f', '\x08')
+_CANCEL = ('\x03', '\x04', 'cancel')
+_KEYS = {
+    '\x1b[A': 'up', '\x1b[B': 'down', '\x1b[5~': 'page_up', '\x1b[6~': 'page_down',
+    '\x1b[C': 'page_down', '\x1b[D': 'page_up', '\x10': 'up', '\x0e': 'down',
+}
+
+class PostIndex:
+    """Word index over the slug, title and date of every post"""
+    
+    def __init__(self, posts):
+        """posts are (status, slug, filepath, title, date) tuples"""
+        # Ids follow display order, so sorting ids sorts newest first
+        self.posts = sorted(posts, key=lambda post: (post[4] or '', post[1]), reverse=True)
+        postings = {}
+        for post_id, (status, slug, filepath, title, date) in enumerate(self.posts):
+            for word in set(_WORD.findall(f"{slug} {title or ''} {date or ''}".lower())):
+                postings.setdefault(word, set()).add(post_id)
+        self.postings = postings
+        self.words = sorted(postings)
+        self._word_text = '\n'.join(self.words)
+        # Offset of each word in _word_text, to map a fuzzy match back to its word
+        self._offsets = []
+        offset = 0
+        for word in self.words:
+            self._offsets.append(offset)
+            offset += len(word) + 1
+    
+    def __len__(self):
+        return len(self.posts)
+    
+    def _prefix_words(self, term):
+        start = bisect_left(self.words, term)
+        return self.words[start:bisect_right(self.words, term + '\x7f', start)]
+    
+    def _fuzzy_words(self, term):
+        """Words containing term's letters in order"""
+        pattern = re.compile('[^\n]*?'.join(map(re.escape, term)))
+        found = set()
+        for match in pattern.finditer(self._word_text):
+            found.add(self.words[bisect_right(self._offsets, match.start()) - 1])
+        return found
+    
+    def _union(self, words):
+        return set().union(*(self.postings[word] for word in words))
+    
+    def search(self, query):
+        """Return post ids matching every word of query, best matches first"""
+        terms = list(dict.fromkeys(_WORD.findall(query.lower())))
+        if not terms:
+            return list(range(len(self.posts)))
+        exact = prefix = fuzzy = None
+        for term in terms:
+            term_exact = self.postings.get(term, set())
+            prefix_words = self._prefix_words(term)
+            term_prefix = self._union(prefix_words)
+            if len(term) >= FUZZY_MIN_LENGTH:
+                term_fuzzy = self._union(self._fuzzy_words(term).difference(prefix_words)) | term_prefix
+            else:
+                term_fuzzy = term_prefix
+            # Each group only narrows as more query words are added
+            exact = term_exact if exact is None else exact & term_exact
+            prefix = term_prefix if prefix is None else prefix & term_prefix
+            fuzzy = term_fuzzy if fuzzy is None else fuzzy & term_fuzzy
+        return sorted(exact) + sorted(prefix - exact) + sorted(fuzzy - prefix)
+    
+    def describe(self, post_id):
+        """One result line: date, status, title and slug"""
+        status, slug, filepath, title, date = self.posts[post_id]
+        status_display = "📝" if status == 'draft' else "✅"
+        return f"{date or '----------'}  {status_display} {title or slug}  ({slug})"
+
+def build_index():
+    """Index every published post and draft; published posts are dated from the catalog"""
+    catalog = load_catalog()['posts']
+    listing = list_post_dates()
+    draft_dates = {slug: date for status, slug, filepath, title, date in listing if date}
+    posts = []
+    for status, slug, filepath, title, date in listing:
+        entry = catalog.get(slug)
+        date = date or (entry['date'] if entry else draft_dates.get(slug))
+        posts.append((status, slug, filepath, title, date))
+    return PostIndex(posts)
+
+def can_pick():
+    """True when the picker can run: stdin and stdout are a terminal that supports raw mode"""
+    if termios is None or not (sys.stdin.isatty() and sys.stdout.isatty()):
+        return False
+    try:
+        termios.tcgetattr(sys.stdin.fileno())
+    except termios.error:
+        return False
+    return True
+
+def _read_key(fd):
+    """Read one key press, returning the character or the name of a special key"""
+    data = os.read(fd, 1)
+    if not data:
+        return 'cancel'
+    if data == b'\x1b':
+        # Escape sequences arrive together; a lone Escape cancels
+        if not select.select([fd], [], [], 0.01)[0]:
+            return 'cancel'
+        return _KEYS.get((data + os.read(fd, 8)).decode('utf-8', errors='ignore'))
+    if data[0] >= 0xc0:
+        # Rest of a multi-byte UTF-8 character
+        data += os.read(fd, 1 if data[0] < 0xe0 else 2 if data[0] < 0xf0 else 3)
+    key = data.decode('utf-8', errors='ignore')
+    return _KEYS.get(key, key)
+
+def _render(index, title, query, results, page, selected, milliseconds):
+    pages = max(1, -(-len(results) // PAGE_SIZE))
+    lines = [
+        f"{title}  ({len(index)} posts)",
+        "Type to search · ↑/↓ select · ←/→ page · Enter choose · Esc cancel",
+        "",
+        f"🔍 {query}",
+        f"   {len(results)} matches, page {page + 1}/{pages} ({milliseconds:.1f} ms)",
+    ]
+    start = page * PAGE_SIZE
+    for i, post_id in enumerate(results[start:start + PAGE_SIZE], start):
+        marker = '›' if i == selected else ' '
+        line = f" {marker} {index.describe(post_id)}"
+        lines.append(f"\x1b[7m{line}\x1b[0m" if i == selected else line)
+    # Clear the screen, draw, and leave the cursor after the query
+    sys.stdout.write('\x1b[H\x1b[2J' + '\r\n'.join(lines) + f"\x1b[4;{4 + len(query)}H")
+    sys.stdout.flush()
+
+def pick_post(title, index=None):
+    """Let the user search for a post; returns (status, slug, filepath) or None if cancelled"""
+    if index is None:
+        index = build_index()
+    if not len(index):
+        print("No existing posts found.")
+        return None
+    
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    query = ''
+    results = index.search(query)
+    milliseconds = 0.0
+    selected = 0
+    try:
+        tty.setraw(fd)
+        while True:
+            page = selected // PAGE_SIZE
+            _render(index, title, query, results, page, selected, milliseconds)
+            key = _read_key(fd)
+            if key in _ENTER:
+                if results:
+                    status, slug, filepath = index.posts[results[selected]][:3]
+                    return status, slug, filepath
+                continue
+            if key in _CANCEL:
+                return None
+            if key == 'up':
+                selected = max(0, selected - 1)
+            elif key == 'down':
+                selected = min(len(results) - 1, selected + 1) if results else 0
+            elif key == 'page_up':
+                selected = max(0, (page - 1) * PAGE_SIZE)
+            elif key == 'page_down':
+                selected = min(len(results) - 1, (page + 1) * PAGE_SIZE) if results else 0
+            elif key in _BACKSPACE or (key and key.isprintable()):
+                query = query[:-1] if key in _BACKSPACE else query + key
+                start = time.perf_counter()
+                results = index.search(query)
+                milliseconds = (time.perf_counter() - start) * 1000
+                selected = 0
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+        sys.stdout.write('\x1b[H\x1b[2J')
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    index = build_index()
+    build_ms = (time.perf_counter() - start) * 1000
+    if len(sys.argv) > 1:
+        query = ' '.join(sys.argv[1:])
+        start = time.perf_counter()
+        results = index.search(query)
+        search_ms = (time.perf_counter() - start) * 1000
+        print(f"🔍 {len(results)} of {len(index)} posts match '{query}' "
+              f"(index {build_ms:.1f} ms, search {search_ms:.2f} ms)")
+        for post_id in results[:PAGE_SIZE]:
+            print(f"   {index.describe(post_id)}")
+        if len(results) > PAGE_SIZE:
+            print(f"   … and {len(results) - PAGE_SIZE} more")
+    elif can_pick():
+        post = pick_post("🔍 Find a Post", index)
+        if post:
+            print(f"✅ {post[0]}: {post[2]}")
+    else:
+        print("❌ The picker needs an interactive terminal. Try: python3 post_picker.py <query>")
+        sys.exit(1)
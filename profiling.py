@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing for the BIO2025 Blog publish pipeline
+
+Code marks its stages with
+
+    with profiling.stage('markdown_to_html') as span:
+        ...
+        span.add_bytes(len(html))
+
+When profiling is off, stage() returns a shared no-op object, so the hooks
+cost one function call each. When it is on, every stage records its wall
+time, the bytes it processed and its peak traced memory (tracemalloc, which
+slows the run down, so compare wall times only between profiled runs).
+
+Enable it with publish_post.py --profile or BIO2025_PROFILE=1. Either one
+accepts a comma-separated list of outputs:
+  json      .build/profile.json            per-stage totals plus every span (always written)
+  trace     .build/profile-trace.json      Chrome trace (chrome://tracing, Perfetto)
+  cprofile  .build/profile.prof            cProfile dump of the main process (pstats, snakeviz)
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import cProfile
+import tracemalloc
+
+from site_io import write_if_changed
+
+PROFILE_ENV = 'BIO2025_PROFILE'
+REPORT_VERSION = 1
+REPORT_PATH = os.path.join('.build', 'profile.json')
+TRACE_PATH = os.path.join('.build', 'profile-trace.json')
+CPROFILE_PATH = os.path.join('.build', 'profile.prof')
+FORMATS = ('json', 'trace', 'cprofile')
+
+_profiler = None
+
+class _NullSpan:
+    """Stands in for a span when profiling is off"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def add_bytes(self, count):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    """One timed stage; nested spans fold their peak memory into their parent"""
+    
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.bytes = 0
+        self.peak = 0
+    
+    def add_bytes(self, count):
+        self.bytes += count
+    
+    def __enter__(self):
+        stack = self.profiler.stack
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, tracemalloc.get_traced_memory()[1])
+        stack.append(self)
+        tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        stack = self.profiler.stack
+        stack.pop()
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, self.peak)
+        self.profiler.spans.append({
+            'name': self.name,
+            'start': self.start,
+            'seconds': seconds,
+            'bytes': self.bytes,
+            'peak_memory': self.peak,
+            'depth': len(stack),
+            'pid': os.getpid(),
+        })
+        return False
+
+class Profiler:
+    """Collects spans for one command run"""
+    
+    def __init__(self, formats, worker=False):
+        self.formats = formats
+        self.worker = worker
+        self.pid = os.getpid()
+        self.spans = []
+        self.stack = []
+        self.started = time.perf_counter()
+        self.cprofile = None
+
+def parse_formats(value):
+    """'1', 'json,trace' ... -> the tuple of outputs to write (json is always included)"""
+    requested = {part.strip().lower() for part in value.split(',') if part.strip()}
+    requested.discard('1')
+    unknown = requested.difference(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown profile output(s): {', '.join(sorted(unknown))} (choose from {', '.join(FORMATS)})")
+    return tuple(fmt for fmt in FORMATS if fmt == 'json' or fmt in requested)
+
+def start(formats=('json',)):
+    """Turn profiling on for this process and write the reports at exit"""
+    global _profiler
+    if _profiler is not None:
+        return
+    _profiler = Profiler(formats)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if 'cprofile' in formats:
+        _profiler.cprofile = cProfile.Profile()
+        _profiler.cprofile.enable()
+    atexit.register(finish)
+    # Not available on Windows; pool workers are covered by init_worker either way
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_forget_parent_spans)
+
+def _forget_parent_spans():
+    """A forked worker starts with a copy of the parent's spans; report only its own"""
+    if _profiler is not None:
+        _profiler.spans = []
+
+def enabled():
+    """True when profiling is on in this process"""
+    return _profiler is not None
+
+def init_worker(profile):
+    """Process pool initializer: profile this worker if the parent is profiled
+    
+    Pass initializer=profiling.init_worker, initargs=(profiling.enabled(),).
+    Works whether the pool forks (the worker drops its copy of the parent's
+    profiler) or spawns (nothing is inherited); the worker's spans go back
+    to the parent through worker_spans() and merge().
+    """
+    global _profiler
+    if not profile:
+        _profiler = None
+        return
+    _profiler = Profiler(('json',), worker=True)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def stage(name):
+    """Context manager timing one pipeline stage"""
+    if _profiler is None:
+        return _NULL_SPAN
+    return Span(_profiler, name)
+
+def worker_spans():
+    """Spans recorded in a pool worker, to be returned to the parent
+    
+    Returns None in the parent itself, whose spans are already collected.
+    """
+    if _profiler is None or not _profiler.worker:
+        return None
+    spans = _profiler.spans
+    _profiler.spans = []
+    return spans
+
+def merge(spans):
+    """Add spans returned by a worker to this process's report"""
+    if _profiler is not None and spans:
+        _profiler.spans.extend(spans)
+
+def summarize(spans):
+    """Total count, seconds, bytes and peak memory per stage name, slowest first"""
+    totals = {}
+    for span in spans:
+        total = totals.setdefault(span['name'], {'count': 0, 'seconds': 0.0, 'bytes': 0, 'peak_memory': 0})
+        total['count'] += 1
+        total['seconds'] += span['seconds']
+        total['bytes'] += span['bytes']
+        total['peak_memory'] = max(total['peak_memory'], span['peak_memory'])
+    return dict(sorted(totals.items(), key=lambda item: item[1]['seconds'], reverse=True))
+
+def chrome_trace(spans, origin):
+    """Spans as Chrome trace 'complete' events, one row per process"""
+    events = [{
+        'name': span['name'],
+        'ph': 'X',
+        'ts': round((span['start'] - origin) * 1e6, 1),
+        'dur': round(span['seconds'] * 1e6, 1),
+        'pid': span['pid'],
+        'tid': span['pid'],
+        'args': {'bytes': span['bytes'], 'peak_memory': span['peak_memory']},
+    } for span in spans]
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+def finish():
+    """Stop profiling and write the requested reports"""
+    global _profiler
+    profiler = _profiler
+    if profiler is None or profiler.worker or os.getpid() != profiler.pid:
+        return
+    _profiler = None
+    if profiler.cprofile is not None:
+        profiler.cprofile.disable()
+        os.makedirs(os.path.dirname(CPROFILE_PATH), exist_ok=True)
+        profiler.cprofile.dump_stats(CPROFILE_PATH)
+    
+    total_seconds = time.perf_counter() - profiler.started
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    spans = sorted(profiler.spans, key=lambda span: span['start'])
+    stages = summarize(spans)
+    report = {
+        'version': REPORT_VERSION,
+        'command': sys.argv,
+        'total_seconds': total_seconds,
+        'peak_memory': max([peak_memory] + [span['peak_memory'] for span in spans]),
+        'processes': len({span['pid'] for span in spans}),
+        'stages': stages,
+        'spans': [dict(span, start=span['start'] - profiler.started) for span in spans],
+    }
+    write_if_changed(REPORT_PATH, json.dumps(report, indent=2) + '\n')
+    if 'trace' in profiler.formats:
+        write_if_changed(TRACE_PATH, json.dumps(chrome_trace(spans, profiler.started), separators=(',', ':')))
+    
+    print(f"\n📊 Profile ({total_seconds:.3f}s total, peak memory {report['peak_memory'] / 1e6:.1f} MB)")
+    print(f"   {'stage':<24}{'calls':>7}{'seconds':>10}{'MB':>10}{'peak MB':>10}")
+    for name, total in stages.items():
+        print(f"   {name:<24}{total['count']:>7}{total['seconds']:>10.3f}"
+              f"{total['bytes'] / 1e6:>10.2f}{total['peak_memory'] / 1e6:>10.1f}")
+    written = [REPORT_PATH]
+    if 'trace' in profiler.formats:
+        written.append(TRACE_PATH)
+    if 'cprofile' in profiler.formats:
+        written.append(CPROFILE_PATH)
+    print(f"📋 Profile written to {', '.join(written)}")
@@ -1,13 +1,39 @@
 #!/usr/bin/env python3
 """
 Publish script for BIO2025 Blog - converts Markdown to HTML
-Usage: python3 publish_post.py post-slug
+Usage:
+  python3 publish_post.py post-slug                  # Publish one draft
+  python3 publish_post.py slug-one slug-two ...      # Publish several drafts in one batch
+  python3 publish_post.py --all [--jobs N]           # Publish every draft in drafts/
+  Unchanged drafts are skipped using .build/manifest.json; add --force to re-render anyway
+  Add --profile[=json,trace,cprofile] (or set BIO2025_PROFILE) for a per-stage timing report
 """
 
 import os
 import sys
 import re
-from datetime import datetime
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from markdown_engine import render_markdown, stream_markdown, BLOCK_CACHE
+from build_manifest import load_manifest, save_manifest, check_draft, record_post, hash_bytes
+from deps import add_references, post_inputs, stale_inputs
+import profiling
+from site_io import write_if_changed, write_chunks_if_changed
+from catalog import queue_index_changes, flush_index_changes
+from images import build_images, add_responsive_images, count_images
+from templates import POST_TEMPLATE, load_template
+from search_index import html_to_text, score_terms, add_terms
+
+# Set BIO2025_MARKDOWN_ENGINE=regex to A/B against the original regex pipeline
+MARKDOWN_ENGINE = os.environ.get('BIO2025_MARKDOWN_ENGINE', 'tokenizer')
+# Set BIO2025_BLOCK_CACHE=.build/block-cache.json to keep rendered blocks between runs
+BLOCK_CACHE_PATH = os.environ.get('BIO2025_BLOCK_CACHE')
+# Drafts at least this many bytes are streamed to their HTML file instead of rendered in memory
+STREAM_THRESHOLD = int(os.environ.get('BIO2025_STREAM_THRESHOLD', 1024 * 1024))
+STREAM_CHUNK_SIZE = 64 * 1024
 
 def parse_frontmatter(content):
     """Parse YAML frontmatter from markdown content"""
@@ -28,8 +54,35 @@ def parse_frontmatter(content):
     
     return frontmatter, '\n'.join(lines[content_start:])
 
-def markdown_to_html(markdown_content):
-    """Convert markdown to HTML (improved implementation)"""
+def check_template():
+    """Exit with a message if the post template is missing"""
+    if not os.path.exists(POST_TEMPLATE):
+        print(f"❌ Post template not found: {POST_TEMPLATE}")
+        sys.exit(1)
+
+def needs_render(manifest, slug, fingerprints):
+    """check_draft, plus the other recorded inputs (template, images) of the post
+    
+    Returns (changed, draft_hash); fingerprints is shared across one build.
+    """
+    md_filepath = os.path.join("drafts", f"{slug}.md")
+    html_filepath = os.path.join("posts", f"{slug}.html")
+    changed, draft_hash = check_draft(manifest, slug, md_filepath, html_filepath)
+    if not changed and stale_inputs(manifest['posts'][slug]['inputs'], fingerprints):
+        changed = True
+    return changed, draft_hash
+
+def markdown_to_html(markdown_content, engine=None):
+    """Convert markdown to HTML with the selected engine ('tokenizer' or 'regex')"""
+    engine = engine or MARKDOWN_ENGINE
+    if engine == 'regex':
+        return markdown_to_html_legacy(markdown_content)
+    if engine != 'tokenizer':
+        raise ValueError(f"Unknown markdown engine: {engine}")
+    return render_markdown(markdown_content, BLOCK_CACHE)
+
+def markdown_to_html_legacy(markdown_content):
+    """Convert markdown to HTML (original multi-pass regex implementation)"""
     html = markdown_content
     
     # Process in order of complexity to avoid conflicts
@@ -121,120 +174,371 @@ def markdown_to_html(markdown_content):
     
     return '\n\n'.join(processed)
 
-def publish_post(slug):
-    """Convert markdown to HTML and publish"""
+def render_post(slug):
+    """Render a draft into its full HTML page, returning the page and its metadata"""
     
     md_filepath = os.path.join("drafts", f"{slug}.md")
     html_filepath = os.path.join("posts", f"{slug}.html")
     
-    if not os.path.exists(md_filepath):
-        print(f"❌ Draft not found: {md_filepath}")
-        print("💡 Run: python3 new_post.py \"Your Title\" to create a draft first")
-        sys.exit(1)
-    
     # Read markdown file
-    with open(md_filepath, 'r') as f:
-        content = f.read()
+    with profiling.stage('read_draft') as span:
+        with open(md_filepath, 'r') as f:
+            content = f.read()
+        span.add_bytes(len(content))
     
     # Parse frontmatter
-    frontmatter, markdown_content = parse_frontmatter(content)
+    with profiling.stage('parse_frontmatter') as span:
+        frontmatter, markdown_content = parse_frontmatter(content)
+        span.add_bytes(len(content))
     
     title = frontmatter.get('title', 'Untitled')
     date_str = frontmatter.get('date', datetime.now().strftime("%Y-%m-%d"))
     excerpt = frontmatter.get('excerpt', 'No excerpt provided...')
     
     # Convert markdown to HTML
-    html_content = markdown_to_html(markdown_content)
+    with profiling.stage('markdown_to_html') as span:
+        html_content = markdown_to_html(markdown_content)
+        span.add_bytes(len(markdown_content))
+    refs = add_references(set(), html_content)
+    with profiling.stage('responsive_images') as span:
+        html_content = add_responsive_images(html_content)
+        span.add_bytes(len(html_content))
     
     # Generate full HTML page
-    formatted_date = datetime.strptime(date_str, "%Y-%m-%d").strftime("%B %d, %Y")
-    
-    full_html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title} - BIO2025 Blog</title>
-    <link rel="stylesheet" href="../styles.css">
-</head>
-<body>
-    <header>
-        <h1><a href="../index.html" style="text-decoration: none; color: inherit;">BIO2025 Blog</a></h1>
-    </header>
-
-    <main>
-        <article class="post">
-            <header>
-                <h1>{title}</h1>
-                <p class="post-meta">{formatted_date}</p>
-            </header>
-            <div class="post-content">
-{html_content}
-            </div>
-        </article>
+    with profiling.stage('template') as span:
+        formatted_date = datetime.strptime(date_str, "%Y-%m-%d").strftime("%B %d, %Y")
+        full_html = load_template(POST_TEMPLATE).render(
+            title=title, date=formatted_date, content=html_content)
+        span.add_bytes(len(full_html))
+    
+    with profiling.stage('search_text') as span:
+        text = html_to_text(html_content)
+        span.add_bytes(len(html_content))
+    
+    post = {
+        'slug': slug,
+        'title': title,
+        'date': date_str,
+        'excerpt': excerpt,
+        'filename': f"{slug}.html",
+        'frontmatter': frontmatter,
+        'text': text,
+        'inputs': post_inputs(refs),
+    }
+    return html_filepath, full_html, post
+
+def read_frontmatter(f):
+    """parse_frontmatter for an open draft: returns (frontmatter, body chunks)
+    
+    Only the frontmatter lines are read up front; the body is yielded in
+    STREAM_CHUNK_SIZE pieces as it is consumed.
+    """
+    first = f.readline()
+    frontmatter = {}
+    if not first.startswith('---'):
+        return frontmatter, _read_chunks(f, first)
+    
+    for line in iter(f.readline, ''):
+        if line.endswith('\n'):
+            line = line[:-1]
+        if line == '---':
+            return frontmatter, _read_chunks(f)
+        if ':' in line:
+            key, value = line.split(':', 1)
+            frontmatter[key.strip()] = value.strip()
+    
+    # Never closed: like parse_frontmatter, the whole file is the body
+    f.seek(0)
+    return frontmatter, _read_chunks(f)
+
+def _read_chunks(f, first=''):
+    if first:
+        yield first
+    yield from iter(lambda: f.read(STREAM_CHUNK_SIZE), '')
+
+def stream_post(slug):
+    """Render a large draft straight into its HTML file and return its metadata
+    
+    Produces the same file as render_post + write_if_changed, but the draft
+    is read in chunks and each paragraph is written as soon as it is rendered,
+    so memory follows the largest block instead of the whole post.
+    """
+    md_filepath = os.path.join("drafts", f"{slug}.md")
+    html_filepath = os.path.join("posts", f"{slug}.html")
+    
+    with profiling.stage('stream_render') as span, open(md_filepath, 'r') as f:
+        frontmatter, chunks = read_frontmatter(f)
+        title = frontmatter.get('title', 'Untitled')
+        date_str = frontmatter.get('date', datetime.now().strftime("%Y-%m-%d"))
+        excerpt = frontmatter.get('excerpt', 'No excerpt provided...')
+        formatted_date = datetime.strptime(date_str, "%Y-%m-%d").strftime("%B %d, %Y")
+        template = load_template(POST_TEMPLATE)
+        
+        # Search terms are counted per paragraph instead of from the full text
+        scores = score_terms(title, excerpt, '')
+        refs = set()
+        digest = hashlib.sha256()
+        
+        def content():
+            separator = ''
+            images = 0
+            # No block cache: it would hold up to DEFAULT_CACHE_SIZE of this post's HTML
+            for paragraph in stream_markdown(chunks):
+                add_references(refs, paragraph)
+                html = add_responsive_images(paragraph, images_before=images)
+                images += count_images(paragraph)
+                add_terms(scores, html_to_text(html))
+                yield separator + html
+                separator = '\n\n'
+        
+        def hashed(pieces):
+            for piece in pieces:
+                digest.update(piece.encode('utf-8'))
+                span.add_bytes(len(piece))
+                yield piece
         
-        <nav class="post-navigation">
-            <a href="../index.html">← Back to Blog</a>
-        </nav>
-    </main>
+        page = template.chunks({'title': title, 'date': formatted_date, 'content': content()})
+        written = write_chunks_if_changed(html_filepath, hashed(page))
+    
+    return {
+        'slug': slug,
+        'title': title,
+        'date': date_str,
+        'excerpt': excerpt,
+        'filename': f"{slug}.html",
+        'frontmatter': frontmatter,
+        'scores': scores,
+        'inputs': post_inputs(refs),
+        'html_hash': digest.hexdigest(),
+        'written': written,
+    }
 
-    <footer>
-        <p>&copy; 2025 BIO2025 Blog</p>
-    </footer>
-</body>
-</html>'''
+def publish_post(slug, force=False):
+    """Convert markdown to HTML and publish"""
+    
+    md_filepath = os.path.join("drafts", f"{slug}.md")
+    html_filepath = os.path.join("posts", f"{slug}.html")
+    
+    if not os.path.exists(md_filepath):
+        print(f"❌ Draft not found: {md_filepath}")
+        print("💡 Run: python3 new_post.py \"Your Title\" to create a draft first")
+        sys.exit(1)
     
-    # Write HTML file
-    with open(html_filepath, 'w') as f:
-        f.write(full_html)
+    check_template()
+    # Refresh image derivatives first: the post is re-rendered if one it shows changed
+    with profiling.stage('images'):
+        build_images(quiet=True)
+    
+    # Skip the render entirely if the draft, its output and its other inputs are unchanged
+    with profiling.stage('manifest_check'):
+        manifest = load_manifest(renderer=MARKDOWN_ENGINE)
+        changed, draft_hash = needs_render(manifest, slug, {})
+    if not changed and not force:
+        save_manifest(manifest)
+        print(f"✅ {html_filepath} is already up to date")
+        print(f"💡 Use --force to re-publish anyway")
+        return
+    
+    if BLOCK_CACHE_PATH:
+        BLOCK_CACHE.load(BLOCK_CACHE_PATH)
+    post = _render_and_write(slug)
+    record_post(manifest, slug, md_filepath, html_filepath,
+                post['frontmatter'], post['html_hash'], draft_hash, post['inputs'])
+    save_manifest(manifest)
+    if BLOCK_CACHE_PATH:
+        BLOCK_CACHE.save(BLOCK_CACHE_PATH)
     
     # Update index.html
-    update_index(title, f"{slug}.html", date_str, excerpt)
+    update_index([post])
     
     print(f"✅ Published post: {html_filepath}")
     print(f"📋 Updated index.html with post listing")
     print(f"🚀 Ready to commit and push!")
 
-def update_index(title, filename, date_str, excerpt):
-    """Add the new post to index.html at the top (newest first)"""
-    
-    # Read current index.html
-    with open('index.html', 'r') as f:
-        content = f.read()
-    
-    # Create new post item
-    formatted_date = datetime.strptime(date_str, "%Y-%m-%d").strftime("%B %d, %Y")
-    new_post_item = f'''            <article class="post-item">
-                <h3><a href="posts/{filename}">{title}</a></h3>
-                <p class="post-meta">{formatted_date}</p>
-                <p class="post-excerpt">{excerpt}</p>
-            </article>
+def update_index(posts):
+    """Record published posts in the catalog, then regenerate index pages, feed and search shards
+    
+    The changes are queued and flushed under the site lock, together with
+    those of any other publish or delete that finished meanwhile.
+    """
+    with profiling.stage('update_index'):
+        # Only posts whose HTML actually changed get a new feed <updated> time
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        queue_index_changes([{
+            'slug': post['slug'],
+            'title': post['title'],
+            'date': post['date'],
+            'excerpt': post['excerpt'],
+            'output': f"posts/{post['filename']}",
+            'updated': now if post['written'] else None,
+            'scores': post.get('scores') or score_terms(post['title'], post['excerpt'], post['text']),
+        } for post in posts])
+        flush_index_changes()
 
-'''
-    
-    # Find the post-list div and insert the new post right after the comment
-    # This ensures new posts always appear at the top
-    post_list_pattern = r'(<!-- Posts will be listed here chronologically -->\s*\n)'
-    replacement = f'\\1\n{new_post_item}'
-    
-    content = re.sub(post_list_pattern, replacement, content)
+# Set in pool workers, which send the blocks they render back to the parent to be saved
+_send_blocks = False
+
+def _init_worker(profile, block_cache_path):
+    """Process pool initializer: profiling, and the persisted block cache if there is one
+    
+    The cache is loaded here rather than inherited, since workers may be
+    spawned instead of forked.
+    """
+    global _send_blocks
+    profiling.init_worker(profile)
+    if block_cache_path:
+        BLOCK_CACHE.load(block_cache_path)
+        _send_blocks = True
+
+def _render_and_write(slug):
+    """Process pool worker: render one draft and write its HTML file if it changed"""
+    if (MARKDOWN_ENGINE == 'tokenizer'
+            and os.path.getsize(os.path.join("drafts", f"{slug}.md")) >= STREAM_THRESHOLD):
+        post = stream_post(slug)
+    else:
+        html_filepath, full_html, post = render_post(slug)
+        with profiling.stage('write_html') as span:
+            post['html_hash'] = hash_bytes(full_html)
+            post['written'] = write_if_changed(html_filepath, full_html)
+            span.add_bytes(len(full_html))
+    # Spans recorded in a worker process travel back with the result, as do rendered blocks
+    post['profile'] = profiling.worker_spans()
+    post['blocks'] = BLOCK_CACHE.drain() if _send_blocks else None
+    return post
+
+def list_draft_slugs():
+    """Return the slugs of every draft in drafts/"""
+    if not os.path.exists("drafts"):
+        return []
+    return sorted(
+        filename[:-3] for filename in os.listdir("drafts")
+        if filename.endswith('.md') and filename != 'README.md'
+    )
+
+def publish_many(slugs, jobs=None, force=False):
+    """Render changed drafts in parallel, then regenerate index.html once"""
     
-    # If the pattern above didn't work, try the fallback method
-    if '<!-- Posts will be listed here chronologically -->' in content and new_post_item.strip() not in content:
-        content = content.replace(
-            '            <!-- Posts will be listed here chronologically -->',
-            f'            <!-- Posts will be listed here chronologically -->\n\n{new_post_item}'
-        )
+    missing = [slug for slug in slugs if not os.path.exists(os.path.join("drafts", f"{slug}.md"))]
+    if missing:
+        for slug in missing:
+            print(f"❌ Draft not found: {os.path.join('drafts', f'{slug}.md')}")
+        sys.exit(1)
     
-    # Write back to index.html
-    with open('index.html', 'w') as f:
-        f.write(content)
+    if not slugs:
+        print("No drafts to publish.")
+        return []
+    
+    jobs = jobs or os.cpu_count() or 1
+    
+    check_template()
+    # Responsive image derivatives; only posts showing a changed image are re-rendered
+    with profiling.stage('images'):
+        build_images(jobs, quiet=True)
+    
+    # Stage 1: compare every draft and its recorded inputs against the build manifest
+    start = time.perf_counter()
+    with profiling.stage('manifest_check'):
+        manifest = load_manifest(renderer=MARKDOWN_ENGINE)
+        draft_hashes = {}
+        fingerprints = {}
+        for slug in slugs:
+            changed, draft_hash = needs_render(manifest, slug, fingerprints)
+            if changed or force:
+                draft_hashes[slug] = draft_hash
+    to_render = list(draft_hashes)
+    scan_seconds = time.perf_counter() - start
+    
+    # Stage 2: render and write the changed posts across worker processes
+    start = time.perf_counter()
+    if jobs == 1 or len(to_render) <= 1:
+        if BLOCK_CACHE_PATH and to_render:
+            BLOCK_CACHE.load(BLOCK_CACHE_PATH)
+        posts = [_render_and_write(slug) for slug in to_render]
+    else:
+        chunksize = max(1, len(to_render) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(profiling.enabled(), BLOCK_CACHE_PATH)) as executor:
+            posts = list(executor.map(_render_and_write, to_render, chunksize=chunksize))
+        if BLOCK_CACHE_PATH:
+            # Each worker loaded the cache itself; the blocks they return are merged below
+            BLOCK_CACHE.load(BLOCK_CACHE_PATH)
+    for post in posts:
+        profiling.merge(post.pop('profile'))
+        blocks = post.pop('blocks')
+        if blocks:
+            BLOCK_CACHE.merge(blocks)
+        slug = post['slug']
+        record_post(manifest, slug, os.path.join("drafts", f"{slug}.md"),
+                    os.path.join("posts", post['filename']),
+                    post['frontmatter'], post['html_hash'], draft_hashes[slug], post['inputs'])
+    save_manifest(manifest)
+    if BLOCK_CACHE_PATH and posts:
+        BLOCK_CACHE.save(BLOCK_CACHE_PATH)
+    render_seconds = time.perf_counter() - start
+    
+    # Stage 3: a single index.html rewrite for the whole batch
+    start = time.perf_counter()
+    if posts:
+        update_index(posts)
+    index_seconds = time.perf_counter() - start
+    
+    written = sum(1 for post in posts if post['written'])
+    print(f"✅ Checked {len(slugs)} drafts: {len(posts)} rendered, "
+          f"{len(slugs) - len(posts)} unchanged, {written} files written")
+    print(f"   Manifest scan:  {scan_seconds:.3f}s ({_rate(len(slugs), scan_seconds)} posts/sec)")
+    print(f"   Render + write: {render_seconds:.3f}s ({_rate(len(posts), render_seconds)} posts/sec, {jobs} worker(s))")
+    print(f"   Index rebuild:  {index_seconds:.3f}s ({_rate(len(posts), index_seconds)} posts/sec)")
+    if posts:
+        print(f"📋 Updated index.html with {len(posts)} post listings")
+        print(f"🚀 Ready to commit and push!")
+    return posts
+
+def _rate(count, seconds):
+    """Format a throughput figure for the batch report"""
+    if seconds <= 0:
+        return "∞"
+    return f"{count / seconds:,.1f}"
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 publish_post.py post-slug")
+    args = sys.argv[1:]
+    jobs = None
+    force = '--force' in args
+    args = [arg for arg in args if arg != '--force']
+    
+    # --profile[=json,trace,cprofile] or BIO2025_PROFILE=1 / =trace,cprofile
+    profile = os.environ.get(profiling.PROFILE_ENV)
+    for arg in [arg for arg in args if arg == '--profile' or arg.startswith('--profile=')]:
+        profile = arg.partition('=')[2] or 'json'
+        args.remove(arg)
+    if profile:
+        try:
+            profiling.start(profiling.parse_formats(profile))
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    if '--jobs' in args:
+        i = args.index('--jobs')
+        try:
+            jobs = int(args[i + 1])
+            if jobs < 1:
+                raise ValueError(jobs)
+        except (IndexError, ValueError):
+            print("❌ --jobs expects a positive number of worker processes")
+            sys.exit(1)
+        del args[i:i + 2]
+    
+    if not args:
+        print("Usage: python3 publish_post.py post-slug [post-slug ...]")
+        print("       python3 publish_post.py --all [--jobs N] [--force]")
         print("Example: python3 publish_post.py my-awesome-post")
         sys.exit(1)
     
-    slug = sys.argv[1]
-    publish_post(slug)
+    if '--all' in args:
+        if len(args) > 1:
+            print("❌ --all publishes every draft; pass either --all or post slugs")
+            sys.exit(1)
+        publish_many(list_draft_slugs(), jobs, force)
+    elif len(args) == 1:
+        publish_post(args[0], force)
+    else:
+        publish_many(args, jobs, force)
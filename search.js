@@ -0,0 +1,106 @@
+// Client for the sharded search index built by search_index.py.
+// Loads search/docs.json once, then only the shards/<prefix>.json files the
+// query's terms fall into. The last term is matched as a prefix so results
+// update while typing; every term must match (AND).
+(function () {
+    const input = document.getElementById('search-input');
+    const results = document.getElementById('search-results');
+    if (!input || !results) {
+        return;
+    }
+
+    const base = input.dataset.index || 'search/';
+    const shards = {};
+    let docsPromise = null;
+    let timer = null;
+
+    function loadDocs() {
+        if (!docsPromise) {
+            docsPromise = fetch(base + 'docs.json').then(response => response.json());
+        }
+        return docsPromise;
+    }
+
+    function loadShard(prefix) {
+        if (!(prefix in shards)) {
+            shards[prefix] = fetch(base + 'shards/' + prefix + '.json')
+                .then(response => response.ok ? response.json() : {})
+                .catch(() => ({}));
+        }
+        return shards[prefix];
+    }
+
+    // Must match search_index.tokenize
+    function tokenize(text, stopwords) {
+        const folded = text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+        return (folded.match(/[a-z0-9]+/g) || []).filter(term => term.length > 1 && !stopwords.has(term));
+    }
+
+    async function search(query) {
+        const docs = await loadDocs();
+        const terms = tokenize(query, new Set(docs.stopwords));
+        if (!terms.length) {
+            return [];
+        }
+
+        const loaded = await Promise.all(terms.map(term => loadShard(term.slice(0, docs.prefix_length))));
+        let totals = null;
+        terms.forEach((term, i) => {
+            const shard = loaded[i];
+            const isPrefix = i === terms.length - 1;
+            const scores = {};
+            const matches = isPrefix ? Object.keys(shard).filter(key => key.startsWith(term)) : [term];
+            matches.forEach(key => {
+                const postings = shard[key] || {};
+                Object.keys(postings).forEach(id => {
+                    scores[id] = (scores[id] || 0) + postings[id];
+                });
+            });
+            if (totals === null) {
+                totals = scores;
+            } else {
+                Object.keys(totals).forEach(id => {
+                    if (id in scores) {
+                        totals[id] += scores[id];
+                    } else {
+                        delete totals[id];
+                    }
+                });
+            }
+        });
+
+        return Object.keys(totals)
+            .sort((a, b) => totals[b] - totals[a])
+            .map(id => docs.docs[id])
+            .filter(Boolean);
+    }
+
+    // Titles and excerpts are inserted as-is, exactly like the index pages do
+    function render(query, matches) {
+        if (!query.trim()) {
+            results.innerHTML = '';
+            return;
+        }
+        if (!matches.length) {
+            results.innerHTML = '<p class="post-meta">No posts found.</p>';
+            return;
+        }
+        results.innerHTML = matches.map(doc => `
+            <article class="post-item">
+                <h3><a href="${doc.url}">${doc.title}</a></h3>
+                <p class="post-excerpt">${doc.excerpt}</p>
+            </article>`).join('');
+    }
+
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(() => {
+            const query = input.value;
+            search(query).then(matches => {
+                if (input.value === query) {
+                    render(query, matches);
+                }
+            });
+        }, 150);
+    });
+})();
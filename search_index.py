@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Build-time full-text search index for BIO2025 Blog
+
+Each post's title, excerpt and rendered text are tokenized into an inverted
+index that is sharded by the first two characters of each term:
+
+  search/docs.json               document ids with the title, link and excerpt search.js shows
+  search/shards/<prefix>.json    {term: {doc_id: score}} for terms starting with prefix
+
+search.js fetches docs.json plus only the shards its query terms need.
+Publishing or deleting a post rewrites just the shards that post touches;
+which shards those are is build-only data, kept in .build/search-shards.json
+so it is not downloaded with docs.json (and recovered from the shards if
+.build/ is missing).
+Usage: python3 search_index.py --rebuild    # Index every post in catalog.json from scratch
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import unicodedata
+
+from site_io import write_if_changed, file_lock
+
+SEARCH_DIR = 'search'
+DOCS_PATH = os.path.join(SEARCH_DIR, 'docs.json')
+SHARDS_DIR = os.path.join(SEARCH_DIR, 'shards')
+# Each document's slug and shards, for updates; never shipped
+STATE_PATH = os.path.join('.build', 'search-shards.json')
+INDEX_VERSION = 2
+PREFIX_LENGTH = 2
+
+# Occurrences in the title count more than in the excerpt, which count more than the body
+TITLE_WEIGHT = 5
+EXCERPT_WEIGHT = 2
+BODY_WEIGHT = 1
+
+# Shipped in docs.json so search.js drops exactly the same words
+STOPWORDS = sorted({
+    'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have',
+    'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was',
+    'were', 'will', 'with',
+})
+_STOPWORDS = frozenset(STOPWORDS)
+
+_TAG = re.compile(r'<[^>]+>')
+_TERM = re.compile(r'[a-z0-9]+')
+_POST_CONTENT = re.compile(r'<div class="post-content">(.*)</div>\s*</article>', re.DOTALL)
+
+def tokenize(text):
+    """Lowercase ASCII-folded terms of two or more characters, minus stopwords"""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    return [term for term in _TERM.findall(text) if len(term) > 1 and term not in _STOPWORDS]
+
+def html_to_text(content):
+    """Strip tags and entities from rendered post HTML"""
+    return html.unescape(_TAG.sub(' ', content))
+
+def post_text_from_html(filepath):
+    """Return the text of a published post's <div class="post-content">"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    match = _POST_CONTENT.search(content)
+    return html_to_text(match.group(1) if match else content)
+
+def add_terms(scores, text, weight=BODY_WEIGHT):
+    """Add weight to scores for every term in text"""
+    for term in tokenize(text):
+        scores[term] = scores.get(term, 0) + weight
+
+def score_terms(title, excerpt, text):
+    """Return {term: score} for one post"""
+    scores = {}
+    for field, weight in ((title, TITLE_WEIGHT), (excerpt, EXCERPT_WEIGHT), (text, BODY_WEIGHT)):
+        add_terms(scores, field, weight)
+    return scores
+
+def _shard_path(prefix):
+    return os.path.join(SHARDS_DIR, f"{prefix}.json")
+
+def _load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def new_docs():
+    """Return an empty document table"""
+    return {'version': INDEX_VERSION, 'next_id': 1, 'docs': {},
+            'stopwords': STOPWORDS, 'prefix_length': PREFIX_LENGTH}
+
+def load_docs():
+    """Load the document table: search/docs.json joined with .build/search-shards.json"""
+    docs = new_docs()
+    public = _load_json(DOCS_PATH, None)
+    if not isinstance(public, dict):
+        return docs
+    if public.get('version') == 1:
+        # Version 1 shipped the slugs and shards in docs.json itself
+        docs['next_id'] = public['next_id']
+        docs['docs'] = {doc_id: {key: doc[key] for key in ('slug', 'title', 'url', 'excerpt', 'shards')}
+                        for doc_id, doc in public['docs'].items()}
+        return docs
+    if public.get('version') != INDEX_VERSION:
+        return docs
+    
+    state = _load_json(STATE_PATH, None)
+    if (not isinstance(state, dict) or state.get('version') != INDEX_VERSION
+            or state['docs'].keys() != public['docs'].keys()):
+        state = _recover_state(public['docs'])
+    docs['next_id'] = state['next_id']
+    docs['docs'] = {doc_id: dict(doc, **state['docs'][doc_id]) for doc_id, doc in public['docs'].items()}
+    return docs
+
+def _recover_state(public_docs):
+    """Rebuild the slug and shard map of every document by reading each shard once"""
+    state = {doc_id: {'slug': os.path.splitext(os.path.basename(doc['url']))[0], 'shards': []}
+             for doc_id, doc in public_docs.items()}
+    highest = max(map(int, state), default=0)
+    if os.path.isdir(SHARDS_DIR):
+        for entry in sorted(os.scandir(SHARDS_DIR), key=lambda entry: entry.name):
+            if not entry.name.endswith('.json'):
+                continue
+            doc_ids = set().union(*_load_json(entry.path, {}).values())
+            # Ids in a shard but not in docs.json must not be handed out again either
+            highest = max([highest, *map(int, doc_ids)])
+            for doc_id in doc_ids.intersection(state):
+                state[doc_id]['shards'].append(entry.name[:-len('.json')])
+    return {'version': INDEX_VERSION, 'next_id': highest + 1, 'docs': state}
+
+def _write_json(path, data):
+    return write_if_changed(path, json.dumps(data, separators=(',', ':'), sort_keys=True, ensure_ascii=False))
+
+def save_docs(docs):
+    """Write docs.json with only what search.js shows, and the rest to .build/"""
+    _write_json(STATE_PATH, {
+        'version': INDEX_VERSION,
+        'next_id': docs['next_id'],
+        'docs': {doc_id: {'slug': doc['slug'], 'shards': doc['shards']} for doc_id, doc in docs['docs'].items()},
+    })
+    _write_json(DOCS_PATH, {
+        'version': INDEX_VERSION,
+        'stopwords': STOPWORDS,
+        'prefix_length': PREFIX_LENGTH,
+        'docs': {doc_id: {'title': doc['title'], 'url': doc['url'], 'excerpt': doc['excerpt']}
+                 for doc_id, doc in docs['docs'].items()},
+    })
+
+def _add_doc(docs, doc_id, post):
+    """Record post in docs under doc_id and return its term scores"""
+    scores = post.get('scores')
+    if scores is None:
+        scores = score_terms(post['title'], post['excerpt'], post['text'])
+    docs['docs'][doc_id] = {
+        'slug': post['slug'],
+        'title': post['title'],
+        'url': post['url'],
+        'excerpt': post['excerpt'],
+        'shards': sorted({term[:PREFIX_LENGTH] for term in scores}),
+    }
+    return scores
+
+def apply_changes(docs, updates, removals):
+    """Re-index updated posts and drop removed ones, touching only their shards
+    
+    updates is a list of dicts with slug, title, excerpt, text and url
+    (or precomputed scores instead of text); removals is a list of slugs. Returns the number of shard files written.
+    """
+    ids = {doc['slug']: doc_id for doc_id, doc in docs['docs'].items()}
+    postings = {}
+    stale = set()
+    
+    for slug in removals:
+        doc_id = ids.pop(slug, None)
+        if doc_id is not None:
+            stale.add(doc_id)
+            postings.update((prefix, None) for prefix in docs['docs'].pop(doc_id)['shards'])
+    
+    new_terms = {}
+    for post in updates:
+        doc_id = ids.get(post['slug'])
+        if doc_id is None:
+            doc_id = str(docs['next_id'])
+            docs['next_id'] += 1
+            ids[post['slug']] = doc_id
+        else:
+            # Drop the previous version's postings wherever they were
+            postings.update((prefix, None) for prefix in docs['docs'][doc_id]['shards'])
+        stale.add(doc_id)
+        new_terms[doc_id] = _add_doc(docs, doc_id, post)
+        postings.update((prefix, None) for prefix in docs['docs'][doc_id]['shards'])
+    
+    # Each affected shard is loaded once, cleaned of stale ids and refilled
+    written = 0
+    for prefix in sorted(postings):
+        path = _shard_path(prefix)
+        shard = _load_json(path, {})
+        for term in list(shard):
+            entries = shard[term]
+            for doc_id in stale.intersection(entries):
+                del entries[doc_id]
+            if not entries:
+                del shard[term]
+        for doc_id, scores in new_terms.items():
+            for term, score in scores.items():
+                if term[:PREFIX_LENGTH] == prefix:
+                    shard.setdefault(term, {})[doc_id] = score
+        if shard:
+            written += _write_json(path, shard)
+        elif os.path.exists(path):
+            os.remove(path)
+            written += 1
+    
+    save_docs(docs)
+    return written
+
+def rebuild():
+    """Index every post in the catalog from its published HTML
+    
+    Runs under the site lock so no publish updates the shards meanwhile. Every
+    shard is rewritten in place (unchanged ones are left alone) and leftover
+    shards are removed last, so readers never find the index empty.
+    """
+    from catalog import load_catalog, sorted_slugs
+    
+    with file_lock():
+        catalog = load_catalog()
+        updates = []
+        for slug in sorted_slugs(catalog):
+            post = catalog['posts'][slug]
+            if not os.path.exists(post['output']):
+                continue
+            updates.append({
+                'slug': slug,
+                'title': post['title'],
+                'excerpt': post['excerpt'],
+                'text': post_text_from_html(post['output']),
+                'url': post['output'],
+            })
+        
+        docs = new_docs()
+        shards = {}
+        for post in updates:
+            doc_id = str(docs['next_id'])
+            docs['next_id'] += 1
+            for term, score in _add_doc(docs, doc_id, post).items():
+                shards.setdefault(term[:PREFIX_LENGTH], {}).setdefault(term, {})[doc_id] = score
+        for prefix, shard in shards.items():
+            _write_json(_shard_path(prefix), shard)
+        save_docs(docs)
+        if os.path.isdir(SHARDS_DIR):
+            keep = {os.path.basename(_shard_path(prefix)) for prefix in shards}
+            for entry in os.scandir(SHARDS_DIR):
+                if entry.name not in keep:
+                    os.remove(entry.path)
+    return len(updates)
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ['--rebuild']:
+        print("Usage: python3 search_index.py --rebuild")
+        sys.exit(1)
+    count = rebuild()
+    shards = len(os.listdir(SHARDS_DIR)) if os.path.isdir(SHARDS_DIR) else 0
+    print(f"✅ Indexed {count} posts into {shards} shards under {SEARCH_DIR}/")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Local preview server for BIO2025 Blog with watch mode and live reload
+Usage:
+  python3 serve.py                  # Serve the site on http://localhost:8000
+  python3 serve.py --watch          # Also rebuild on save and reload open tabs
+  python3 serve.py --watch --port 8080
+Open http://localhost:8000/editor.html to save and publish from the rich editor (see editor_api.py)
+"""
+
+import os
+import sys
+import time
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from publish_post import publish_many, list_draft_slugs
+from images import IMAGES_DIR, DERIVED_DIR
+from templates import POST_TEMPLATE, INDEX_TEMPLATE
+from catalog import load_catalog, render_index
+from site_io import file_lock
+import editor_api
+
+WATCH_PATHS = ['drafts', 'media', 'styles.css', POST_TEMPLATE, INDEX_TEMPLATE]
+# Generated by the build itself, so changes there must not trigger another rebuild
+IGNORED_PATHS = {DERIVED_DIR}
+# Poll often and rebuild once saves have been quiet for DEBOUNCE_SECONDS
+POLL_SECONDS = 0.05
+DEBOUNCE_SECONDS = 0.05
+KEEPALIVE_SECONDS = 15
+LIVERELOAD_PATH = '/__livereload'
+
+LIVERELOAD_SCRIPT = f'''<script>
+new EventSource("{LIVERELOAD_PATH}").onmessage = function () {{ location.reload(); }};
+</script>
+'''
+
+class ReloadNotifier:
+    """Counts site rebuilds and wakes up every waiting live-reload stream"""
+    
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+    
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+    
+    def wait(self, version, timeout):
+        """Block until the version moves past version or timeout expires"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """Static file handler that can inject the live-reload script into HTML"""
+    
+    notifier = None
+    
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+    
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path.startswith(editor_api.API_PREFIX):
+            editor_api.handle(self, 'GET')
+            return
+        if self.notifier is not None and path == LIVERELOAD_PATH:
+            self.stream_reloads()
+            return
+        filepath = self.translate_path(path)
+        if os.path.isdir(filepath):
+            filepath = os.path.join(filepath, 'index.html')
+        if self.notifier is not None and filepath.endswith('.html') and os.path.isfile(filepath):
+            self.send_html(filepath)
+            return
+        super().do_GET()
+    
+    def do_POST(self):
+        if self.path.startswith(editor_api.API_PREFIX):
+            editor_api.handle(self, 'POST')
+            return
+        self.send_error(405)
+    
+    def send_html(self, filepath):
+        """Serve an HTML page with the live-reload client appended to its body"""
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        script = LIVERELOAD_SCRIPT.encode('utf-8')
+        body_end = content.rfind(b'</body>')
+        if body_end == -1:
+            content += script
+        else:
+            content = content[:body_end] + script + content[body_end:]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+    
+    def stream_reloads(self):
+        """Hold a Server-Sent Events stream open and send 'reload' after each rebuild"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        version = self.notifier.version
+        try:
+            while True:
+                current = self.notifier.wait(version, KEEPALIVE_SECONDS)
+                if current != version:
+                    version = current
+                    self.wfile.write(b'data: reload\n\n')
+                else:
+                    self.wfile.write(b': keepalive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
+    def log_message(self, format, *args):
+        # Keep the console for rebuild output; only report failed requests
+        if len(args) > 1 and str(args[1]).startswith(('4', '5')):
+            super().log_message(format, *args)
+
+def snapshot(paths=WATCH_PATHS):
+    """Map every watched file to its (mtime, size)"""
+    files = {}
+    pending = list(paths)
+    while pending:
+        path = pending.pop()
+        try:
+            if os.path.isdir(path):
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            if entry.path not in IGNORED_PATHS:
+                                pending.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            else:
+                stat = os.stat(path)
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            continue
+    return files
+
+def changed_paths(before, after):
+    """Return paths that were added, removed or modified between two snapshots"""
+    changed = {path for path, signature in after.items() if before.get(path) != signature}
+    changed.update(path for path in before if path not in after)
+    return changed
+
+def rebuild(paths):
+    """Re-render the published posts among paths; other media and CSS only need a reload
+    
+    Drafts that are not in the catalog yet are left alone: watch mode never
+    publishes a post, it only keeps published ones up to date.
+    """
+    published = load_catalog()['posts']
+    if POST_TEMPLATE in paths or any(os.path.dirname(path) == IMAGES_DIR for path in paths):
+        # publish_many regenerates derivatives and re-renders only the posts built from them
+        slugs = [slug for slug in list_draft_slugs() if slug in published]
+        if slugs:
+            publish_many(slugs, jobs=1)
+        return
+    if INDEX_TEMPLATE in paths:
+        with file_lock():
+            render_index(load_catalog())
+    slugs = sorted(
+        os.path.basename(path)[:-3] for path in paths
+        if os.path.dirname(path) == 'drafts' and path.endswith('.md')
+        and os.path.basename(path)[:-3] in published and os.path.exists(path)
+    )
+    if not slugs:
+        return
+    # Serial in-process render keeps the block cache warm between saves
+    publish_many(slugs, jobs=1)
+
+def watch(notifier, on_change=rebuild):
+    """Poll the watched paths forever, rebuilding after each burst of saves"""
+    before = snapshot()
+    pending = set()
+    last_change = 0
+    while True:
+        time.sleep(POLL_SECONDS)
+        after = snapshot()
+        changed = changed_paths(before, after)
+        before = after
+        if changed:
+            pending |= changed
+            last_change = time.monotonic()
+            continue
+        if not pending or time.monotonic() - last_change < DEBOUNCE_SECONDS:
+            continue
+    
+        start = time.perf_counter()
+        print(f"\n🔄 Changed: {', '.join(sorted(pending))}")
+        try:
+            # Editor publishes run in this process too; wait for any in progress
+            with editor_api.BUILD_LOCK:
+                on_change(pending)
+        except SystemExit:
+            pass
+        except Exception as e:
+            print(f"❌ Rebuild failed: {e}")
+        else:
+            notifier.notify()
+            print(f"✅ Reloaded browsers in {(time.perf_counter() - start) * 1000:.0f} ms")
+        pending = set()
+
+def serve(port=8000, watch_mode=False):
+    """Serve the site from the current directory"""
+    notifier = ReloadNotifier() if watch_mode else None
+    PreviewHandler.notifier = notifier
+    server = ThreadingHTTPServer(('localhost', port), partial(PreviewHandler, directory='.'))
+    server.daemon_threads = True
+    
+    if watch_mode:
+        thread = threading.Thread(target=watch, args=(notifier,), daemon=True)
+        thread.start()
+        print(f"👀 Watching {', '.join(WATCH_PATHS)} for changes")
+    
+    print(f"🚀 Serving BIO2025 Blog at http://localhost:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped.")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    watch_mode = '--watch' in args
+    if watch_mode:
+        args.remove('--watch')
+    port = 8000
+    if len(args) == 2 and args[0] == '--port':
+        port = int(args[1])
+    elif args:
+        print("Usage: python3 serve.py [--watch] [--port N]")
+        sys.exit(1)
+    
+    serve(port, watch_mode)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Shared file output helpers for BIO2025 Blog build scripts
+
+Every generated file is written to a temporary file next to it and moved
+into place with os.replace, so a crash or a concurrent reader never sees a
+half-written page: the old file or the new one, never a truncated one.
+
+Build state that several publishes read, modify and write back (the catalog,
+the index pages, the build manifest, the image derivatives, the search index)
+is only touched under file_lock(), which also holds across processes. Changes
+to the index are queued with enqueue() and applied in batches by whichever
+process holds the lock (see catalog.flush_index_changes).
+"""
+
+import os
+import json
+import time
+import filecmp
+import itertools
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+LOCK_DIR = '.build'
+QUEUE_DIR = os.path.join('.build', 'queue')
+SITE_LOCK = 'site'
+
+_local_locks = {}
+_held = set()
+_guard = threading.Lock()
+_sequence = itertools.count()
+
+def temp_path(filepath):
+    """A temporary name next to filepath, unique to this process and thread"""
+    return f"{filepath}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+def write_atomic(filepath, data):
+    """Replace filepath with data in one step"""
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    tmp_path = temp_path(filepath)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_if_changed(filepath, content):
+    """Write content to filepath only if the bytes differ; returns True if written"""
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    
+    try:
+        if os.path.getsize(filepath) == len(data):
+            with open(filepath, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    
+    write_atomic(filepath, data)
+    return True
+
+def write_chunks_if_changed(filepath, chunks):
+    """Stream text chunks into filepath, replacing it only if the bytes differ; returns True if written
+    
+    The output goes to a temporary file that is compared with the existing
+    one block by block, so neither version is ever held in memory.
+    """
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    tmp_path = temp_path(filepath)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    
+    try:
+        unchanged = (os.path.getsize(filepath) == os.path.getsize(tmp_path)
+                     and filecmp.cmp(filepath, tmp_path, shallow=False))
+    except OSError:
+        unchanged = False
+    if unchanged:
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, filepath)
+    return True
+
+def _lock_file(fd, path):
+    """Take an exclusive lock on an open lock file, saying so if another build holds it"""
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(f"⏳ Waiting for another build to release {path}...")
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    # msvcrt.locking gives up after 10 seconds, so keep retrying
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+@contextmanager
+def file_lock(name=SITE_LOCK):
+    """Hold .build/<name>.lock exclusively, across processes and threads
+    
+    Re-entrant: code already holding the lock can call functions that take it.
+    """
+    path = os.path.join(LOCK_DIR, f"{name}.lock")
+    with _guard:
+        local = _local_locks.setdefault(path, threading.RLock())
+    with local:
+        if path in _held:
+            yield
+            return
+        os.makedirs(LOCK_DIR, exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock_file(fd, path)
+            _held.add(path)
+            try:
+                yield
+            finally:
+                _held.discard(path)
+        finally:
+            # Closing the file releases the lock
+            os.close(fd)
+
+def enqueue(queue, item):
+    """Add a JSON-serializable item to .build/queue/<queue>/ for the next drain()"""
+    name = f"{time.time_ns():020d}-{os.getpid()}-{next(_sequence):06d}.json"
+    write_atomic(os.path.join(QUEUE_DIR, queue, name),
+                 json.dumps(item, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
+@contextmanager
+def drain(queue):
+    """Yield every queued item, oldest first, and remove them once the caller is done
+    
+    Call with the queue's lock held. If the caller fails, the items stay
+    queued for the next drain.
+    """
+    directory = os.path.join(QUEUE_DIR, queue)
+    try:
+        # Items still being written end in .tmp
+        names = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    except FileNotFoundError:
+        names = []
+    items = []
+    for name in names:
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            items.append(json.load(f))
+    yield items
+    for name in names:
+        os.remove(os.path.join(directory, name))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compiled page templates for BIO2025 Blog
+
+A template is an HTML file with named slots, e.g. {{ title }}. It is split
+once into static fragments and slot names; rendering just interleaves the
+fragments with the slot values, so a batch build never re-parses a layout.
+Compiled templates are cached per process and recompiled only when the
+file's size or mtime changes.
+
+  posts/post-template.html    post pages: title, date, content
+  index-template.html         page/<n>.html and archive/<year>.html: title, heading, post_list
+"""
+
+import os
+import re
+import hashlib
+
+POST_TEMPLATE = os.path.join('posts', 'post-template.html')
+INDEX_TEMPLATE = 'index-template.html'
+
+_SLOT = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# {path: ((size, mtime_ns), Template)}
+_compiled = {}
+
+class Template:
+    """A layout split into static fragments around its named slots"""
+
+    def __init__(self, source, path=None):
+        self.path = path
+        parts = _SLOT.split(source)
+        # Even entries are static HTML, odd entries are slot names
+        self.fragments = parts[0::2]
+        self.slots = parts[1::2]
+        self.digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def chunks(self, values):
+        """Yield the page piece by piece; a slot value may be a string or an iterable of strings"""
+        missing = set(self.slots).difference(values)
+        if missing:
+            raise KeyError(f"{self.path or 'template'} needs a value for: {', '.join(sorted(missing))}")
+        fragments = self.fragments
+        for i, slot in enumerate(self.slots):
+            yield fragments[i]
+            value = values[slot]
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+        yield fragments[-1]
+
+    def render(self, **values):
+        """Return the whole page as one string"""
+        return ''.join(self.chunks(values))
+
+def load_template(path):
+    """Return the compiled template at path, compiling it only when the file changes"""
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    cached = _compiled.get(path)
+    if cached is None or cached[0] != signature:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            cached = (signature, Template(f.read(), path))
+        _compiled[path] = cached
+    return cached[1]